@@ -3,13 +3,71 @@ Agent with search algorithms for pathfinding and planning
 """
 
 from typing import List, Dict, Optional, Tuple, Set
-from collections import deque
+from collections import deque, OrderedDict
+import copy
 import heapq
+import itertools
 from config import Config
 from environment import Environment
 from bayesian_reasoning import BayesianBeliefSystem
 
 
+def _popcount(mask: int) -> int:
+    """Count set bits (int.bit_count needs Python 3.10)"""
+    return bin(mask).count("1")
+
+
+def _mask_to_set(mask: int) -> Set[int]:
+    """Expand a bitmask into the set of its set bit positions"""
+    ids = set()
+    index = 0
+    while mask:
+        if mask & 1:
+            ids.add(index)
+        mask >>= 1
+        index += 1
+    return ids
+
+
+def _ids_to_mask(ids) -> int:
+    """Pack an iterable of small non-negative ints into a bitmask"""
+    mask = 0
+    for i in ids:
+        mask |= 1 << i
+    return mask
+
+
+def _bfs_csr(adj_nodes, adj_ptr, adj_locked, num_rooms: int,
+             start: int, goal: int) -> Tuple[Optional[List[int]], int]:
+    """
+    BFS kernel over the Environment CSR arrays
+    Uses only flat int buffers (preallocated parent array, index-based queue) so it
+    can be handed to a JIT unchanged
+    Returns: (parent array with parent[start] == start, or None if unreachable; nodes expanded)
+    """
+    parent = [-1] * num_rooms
+    queue = [0] * num_rooms
+    parent[start] = start
+    queue[0] = start
+    head, tail = 0, 1
+    
+    while head < tail:
+        current = queue[head]
+        head += 1
+        for i in range(adj_ptr[current], adj_ptr[current + 1]):
+            if adj_locked[i]:
+                continue
+            neighbor = adj_nodes[i]
+            if parent[neighbor] == -1:
+                parent[neighbor] = current
+                if neighbor == goal:
+                    return parent, head
+                queue[tail] = neighbor
+                tail += 1
+                
+    return None, head
+
+
 class Agent:
     """Player agent with AI search capabilities"""
     
@@ -18,18 +76,72 @@ class Agent:
         self.env = environment
         self.current_room = environment.start_room_id
         self.health = self.config.AGENT_HEALTH
-        self.keys_collected = set()
-        self.rooms_visited = set([self.current_room])
+        # Collected keys and visited rooms as bitmasks (bit i set = key/room i)
+        self.keys_mask = 0
+        self.rooms_visited_mask = 1 << self.current_room
+        self._all_keys_mask = (1 << environment.total_keys) - 1
         self.belief_system = BayesianBeliefSystem(
             num_rooms=environment.room_count,
-            config=config
+            config=config,
+            distances=environment.door_distances
         )
         
+        # LRU cache of computed paths, see find_path
+        self._path_cache: OrderedDict = OrderedDict()
+        
         # Stats
         self.moves_made = 0
         self.traps_triggered = 0
         self.puzzles_solved = 0
         
+    def copy(self) -> 'Agent':
+        """
+        Copy of the agent for simulations, sharing the environment
+        Key/visit masks are ints, so only the beliefs need an actual copy
+        """
+        clone = copy.copy(self)
+        clone.belief_system = self.belief_system.copy()
+        clone._path_cache = OrderedDict()
+        return clone
+        
+    @property
+    def keys_collected(self) -> Set[int]:
+        """Collected key IDs as a set (derived from keys_mask)"""
+        return _mask_to_set(self.keys_mask)
+        
+    @keys_collected.setter
+    def keys_collected(self, key_ids):
+        self.keys_mask = _ids_to_mask(key_ids)
+        
+    @property
+    def rooms_visited(self) -> Set[int]:
+        """Visited room IDs as a set (derived from rooms_visited_mask)"""
+        return _mask_to_set(self.rooms_visited_mask)
+        
+    @rooms_visited.setter
+    def rooms_visited(self, room_ids):
+        self.rooms_visited_mask = _ids_to_mask(room_ids)
+        
+    def has_key(self, key_id: int) -> bool:
+        """Check if a key has been collected"""
+        return bool(self.keys_mask >> key_id & 1)
+        
+    def has_all_keys(self) -> bool:
+        """Check if every key has been collected"""
+        return self.keys_mask & self._all_keys_mask == self._all_keys_mask
+        
+    def key_count(self) -> int:
+        """Number of keys collected"""
+        return _popcount(self.keys_mask)
+        
+    def has_visited(self, room_id: int) -> bool:
+        """Check if a room has been visited"""
+        return bool(self.rooms_visited_mask >> room_id & 1)
+        
+    def rooms_visited_count(self) -> int:
+        """Number of rooms visited"""
+        return _popcount(self.rooms_visited_mask)
+        
     def move_to(self, room_id: int) -> Tuple[bool, str]:
         """
         Move to a room and handle consequences
@@ -40,7 +152,7 @@ class Agent:
             
         self.current_room = room_id
         self.moves_made += 1
-        self.rooms_visited.add(room_id)
+        self.rooms_visited_mask |= 1 << room_id
         
         room = self.env.get_room(room_id)
         room.visited = True
@@ -59,8 +171,8 @@ class Agent:
         # Check for keys
         if self.env.collect_key(room_id):
             key_id = room.key_id
-            self.keys_collected.add(key_id)
-            messages.append(f"🔑 Found KEY #{key_id}! Total keys: {len(self.keys_collected)}/{self.env.total_keys}")
+            self.keys_mask |= 1 << key_id
+            messages.append(f"🔑 Found KEY #{key_id}! Total keys: {self.key_count()}/{self.env.total_keys}")
             
         return True, " | ".join(messages)
         
@@ -72,28 +184,91 @@ class Agent:
         if start == goal:
             return [start]
             
-        queue = deque([(start, [start])])
-        visited = {start}
-        nodes_expanded = 0
-        
-        while queue:
-            current, path = queue.popleft()
-            nodes_expanded += 1
+        if self.env.room_count >= self.config.BIDIRECTIONAL_BFS_MIN_ROOMS:
+            return self._find_path_bidirectional(start, goal)
             
-            # Get unlocked neighbors
-            for neighbor in self.env.get_unlocked_neighbors(current):
-                if neighbor == goal:
-                    final_path = path + [neighbor]
-                    if self.config.VERBOSE:
-                        print(f"  [BFS] Path found! Length: {len(final_path)}, Nodes expanded: {nodes_expanded}")
-                    return final_path
-                    
-                if neighbor not in visited:
-                    visited.add(neighbor)
-                    queue.append((neighbor, path + [neighbor]))
-                    
+        env = self.env
+        parent, nodes_expanded = _bfs_csr(env.adj_nodes, env.adj_ptr, env.adj_locked,
+                                          env.room_count, start, goal)
+        if parent is None:
+            return None  # No path found
+            
+        final_path = [goal]
+        node = goal
+        while node != start:
+            node = parent[node]
+            final_path.append(node)
+        final_path.reverse()
+        
+        if self.config.VERBOSE:
+            print(f"  [BFS] Path found! Length: {len(final_path)}, Nodes expanded: {nodes_expanded}")
+        return final_path
+        
+    def _find_path_bidirectional(self, start: int, goal: int) -> Optional[List[int]]:
+        """
+        Bidirectional BFS for large maps (doors are two-way, so both sides share neighbors)
+        Expands the smaller frontier one full layer at a time until the searches meet
+        """
+        fwd_parent = {start: None}
+        bwd_parent = {goal: None}
+        fwd_frontier = [start]
+        bwd_frontier = [goal]
+        nodes_expanded = 0  # Counted per layer, not per node
+        
+        while fwd_frontier and bwd_frontier:
+            forward = len(fwd_frontier) <= len(bwd_frontier)
+            if forward:
+                frontier, parent, other = fwd_frontier, fwd_parent, bwd_parent
+            else:
+                frontier, parent, other = bwd_frontier, bwd_parent, fwd_parent
+                
+            next_frontier = []
+            meetings = []
+            nodes_expanded += len(frontier)
+            for current in frontier:
+                for neighbor in self.env.get_unlocked_neighbors(current):
+                    if neighbor not in parent:
+                        parent[neighbor] = current
+                        if neighbor in other:
+                            meetings.append(neighbor)
+                        next_frontier.append(neighbor)
+                        
+            # Every meeting point in this layer is a candidate; keep the shortest
+            if meetings:
+                final_path = min((self._stitch_path(fwd_parent, bwd_parent, meet) for meet in meetings),
+                                 key=len)
+                if self.config.VERBOSE:
+                    print(f"  [BFS] Path found! Length: {len(final_path)}, Nodes expanded: {nodes_expanded}")
+                return final_path
+                
+            if forward:
+                fwd_frontier = next_frontier
+            else:
+                bwd_frontier = next_frontier
+                
         return None  # No path found
         
+    def _stitch_path(self, fwd_parent: Dict[int, Optional[int]],
+                     bwd_parent: Dict[int, Optional[int]], meet: int) -> List[int]:
+        """Join the forward path start → meet with the backward chain meet → goal"""
+        path = self._reconstruct_path(fwd_parent, meet)
+        node = bwd_parent[meet]
+        while node is not None:
+            path.append(node)
+            node = bwd_parent[node]
+        return path
+        
+    @staticmethod
+    def _reconstruct_path(parent: Dict[int, Optional[int]], goal: int) -> List[int]:
+        """Walk parent pointers back from goal and return the path start → goal"""
+        path = []
+        node = goal
+        while node is not None:
+            path.append(node)
+            node = parent[node]
+        path.reverse()
+        return path
+        
     def find_path_astar(self, start: int, goal: int) -> Optional[List[int]]:
         """
         Find optimal path using A* search with heuristic
@@ -102,75 +277,110 @@ class Agent:
         if start == goal:
             return [start]
             
-        def heuristic(room_id: int) -> float:
-            """Estimate cost to goal: distance + trap risk"""
-            distance = abs(room_id - goal)
-            trap_risk = self.belief_system.get_trap_probability(room_id) * 10
-            return distance + trap_risk
-            
-        # Priority queue: (f_score, room_id, path)
-        open_set = [(heuristic(start), 0, start, [start])]
-        visited = set()
-        nodes_expanded = 0
+        # Beliefs don't change during a single search, so h (distance + trap risk)
+        # is computed for every room up front from one snapshot of the beliefs
+        trap_probs = self.belief_system.get_trap_probabilities()
+        h = [abs(room_id - goal) + trap_prob * 10 for room_id, trap_prob in enumerate(trap_probs)]
+        
+        # Priority queue: (f_score, tiebreak, room_id); g/parent kept alongside
+        # Edges all cost 1, but f includes real-valued trap risk, so a bucket queue would
+        # need quantised keys; on these map sizes it measured slower than the C heapq
+        counter = itertools.count()
+        open_set = [(h[start], next(counter), start)]
+        g_score = {start: 0}
+        parent = {start: None}
+        closed = set()
         
         while open_set:
-            f_score, g_score, current, path = heapq.heappop(open_set)
-            nodes_expanded += 1
+            f_score, _, current = heapq.heappop(open_set)
             
-            if current in visited:
+            # Skip stale entries superseded by a cheaper push
+            if current in closed:
                 continue
                 
-            visited.add(current)
+            closed.add(current)
             
             if current == goal:
+                path = self._reconstruct_path(parent, goal)
                 if self.config.VERBOSE:
-                    print(f"  [A*] Path found! Length: {len(path)}, Cost: {g_score:.2f}, Nodes expanded: {nodes_expanded}")
+                    # Every push except those still queued has been popped
+                    nodes_expanded = next(counter) - len(open_set)
+                    print(f"  [A*] Path found! Length: {len(path)}, Cost: {g_score[goal]:.2f}, Nodes expanded: {nodes_expanded}")
                 return path
                 
             # Explore neighbors
+            new_g_score = g_score[current] + 1
             for neighbor in self.env.get_unlocked_neighbors(current):
-                if neighbor not in visited:
-                    new_g_score = g_score + 1
-                    new_f_score = new_g_score + heuristic(neighbor)
-                    heapq.heappush(open_set, 
-                                  (new_f_score, new_g_score, neighbor, path + [neighbor]))
+                if neighbor in closed:
+                    continue
+                # Only push on improvement, so each room has at most one live entry
+                old_g_score = g_score.get(neighbor)
+                if old_g_score is None or new_g_score < old_g_score:
+                    g_score[neighbor] = new_g_score
+                    parent[neighbor] = current
+                    heapq.heappush(open_set,
+                                  (new_g_score + h[neighbor], next(counter), neighbor))
                     
         return None  # No path found
         
     def find_path(self, start: int, goal: int) -> Optional[List[int]]:
-        """Find path using configured algorithm"""
-        if self.config.SEARCH_ALGORITHM == "bfs":
-            return self.find_path_bfs(start, goal)
-        elif self.config.SEARCH_ALGORITHM == "astar":
-            return self.find_path_astar(start, goal)
+        """
+        Find path using configured algorithm
+        BFS on small maps uses Environment.shortest_path; other results are
+        cached until a door is unlocked or beliefs change
+        """
+        algorithm = self.config.SEARCH_ALGORITHM
+        
+        # Hop-count paths on small maps come straight from the all-pairs table
+        if algorithm != "astar" and self.env.room_count <= self.config.ALL_PAIRS_MAX_ROOMS:
+            return self.env.shortest_path(start, goal)
+            
+        key = (start, goal, algorithm, self.env.graph_version, self.belief_system.version)
+        
+        if key in self._path_cache:
+            self._path_cache.move_to_end(key)
+            path = self._path_cache[key]
+            return list(path) if path is not None else None
+            
+        if algorithm == "astar":
+            path = self.find_path_astar(start, goal)
         else:
-            return self.find_path_bfs(start, goal)
+            path = self.find_path_bfs(start, goal)
+            
+        self._path_cache[key] = path
+        if len(self._path_cache) > self.config.PATH_CACHE_SIZE:
+            self._path_cache.popitem(last=False)
+            
+        return list(path) if path is not None else None
             
     def find_nearest_key(self) -> Optional[Tuple[int, List[int]]]:
         """
-        Find the nearest uncollected key
+        Find the nearest uncollected key with a single multi-target BFS
         Returns: (room_id, path) or None
         """
-        key_rooms = []
-        for room_id, room in self.env.rooms.items():
-            if room.has_key and room.key_id not in self.keys_collected:
-                key_rooms.append(room_id)
-                
-        if not key_rooms:
+        keys_mask = self.keys_mask
+        targets = {room_id for key_id, room_id in self.env.key_to_room.items()
+                   if not keys_mask >> key_id & 1}
+        
+        if not targets:
             return None
             
-        # Find shortest path to any key room
-        best_path = None
-        best_room = None
+        start = self.current_room
+        if start in targets:
+            return start, [start]
+            
+        queue = deque([start])
+        parent = {start: None}
         
-        for key_room in key_rooms:
-            path = self.find_path(self.current_room, key_room)
-            if path and (best_path is None or len(path) < len(best_path)):
-                best_path = path
-                best_room = key_room
-                
-        if best_path:
-            return best_room, best_path
+        while queue:
+            current = queue.popleft()
+            for neighbor in self.env.get_unlocked_neighbors(current):
+                if neighbor not in parent:
+                    parent[neighbor] = current
+                    if neighbor in targets:
+                        return neighbor, self._reconstruct_path(parent, neighbor)
+                    queue.append(neighbor)
+                    
         return None
         
     def plan_escape_route(self) -> Optional[List[int]]:
@@ -188,18 +398,20 @@ class Agent:
         status.append("="*60)
         status.append(f"Location: {room.name} (Room {self.current_room})")
         status.append(f"Health: {self.health}/{self.config.AGENT_HEALTH}")
-        status.append(f"Keys: {len(self.keys_collected)}/{self.env.total_keys} collected")
+        status.append(f"Keys: {self.key_count()}/{self.env.total_keys} collected")
         status.append(f"Moves: {self.moves_made}")
         status.append(f"Traps triggered: {self.traps_triggered}")
         status.append(f"Puzzles solved: {self.puzzles_solved}")
-        status.append(f"Rooms visited: {len(self.rooms_visited)}/{self.env.room_count}")
+        status.append(f"Rooms visited: {self.rooms_visited_count()}/{self.env.room_count}")
         
         # Show available moves
         neighbors = self.env.get_unlocked_neighbors(self.current_room)
         status.append(f"\nAvailable moves: {len(neighbors)} rooms")
+        rooms = self.env.rooms
+        get_trap_probability = self.belief_system.get_trap_probability
         for nid in neighbors:
-            neighbor = self.env.get_room(nid)
-            trap_prob = self.belief_system.get_trap_probability(nid)
+            neighbor = rooms[nid]
+            trap_prob = get_trap_probability(nid)
             risk = "HIGH RISK" if trap_prob > 0.6 else "MEDIUM RISK" if trap_prob > 0.3 else "Low risk"
             visited = "✓" if neighbor.visited else "?"
             status.append(f"  → Room {nid}: {neighbor.name} [{risk}, P={trap_prob:.2f}] {visited}")
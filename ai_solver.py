@@ -18,12 +18,14 @@ class AISolver:
     Automated AI that plays the escape room using intelligent algorithms
     """
     
-    def __init__(self, config: Config = None, verbose: bool = True):
+    def __init__(self, config: Config = None, verbose: bool = True, environment: Environment = None,
+                 agent: Agent = None, guard: Guard = None):
+        """Solves a fresh game unless an existing environment (and its agent/guard) is passed in"""
         self.config = config or Config()
         self.verbose = verbose
-        self.env = Environment(self.config)
-        self.agent = Agent(self.env, self.config)
-        self.guard = Guard(self.env, self.config)
+        self.env = environment or Environment(self.config)
+        self.agent = agent or Agent(self.env, self.config)
+        self.guard = guard or Guard(self.env, self.config)
         
         # Game state tracking
         self.turn = 0
@@ -36,29 +38,29 @@ class AISolver:
         self.use_astar = True  # Use A* instead of BFS
         self.debug_mode = True
         
-    def log(self, message: str):
-        """Log message if verbose mode is enabled"""
-        if self.verbose:
-            print(f"[Turn {self.turn:3d}] {message}")
+    def log(self, message: str, *args):
+        """
+        Log message if verbose mode is enabled
+        %-style args are only formatted when the message is actually printed
+        """
+        if not self.verbose:
+            return
+        if args:
+            message = message % args
+        print(f"[Turn {self.turn:3d}] {message}")
     
     def get_safe_neighbors(self, room_id: int) -> List[int]:
         """Get neighboring rooms that are relatively safe"""
         neighbors = self.env.get_unlocked_neighbors(room_id)
-        safe_neighbors = []
-        
-        for neighbor_id in neighbors:
-            trap_prob = self.agent.belief_system.get_trap_probability(neighbor_id)
-            if trap_prob < self.risk_tolerance:
-                safe_neighbors.append(neighbor_id)
+        get_trap_probability = self.agent.belief_system.get_trap_probability
+        risk_tolerance = self.risk_tolerance
         
-        return safe_neighbors
+        return [neighbor_id for neighbor_id in neighbors
+                if get_trap_probability(neighbor_id) < risk_tolerance]
     
     def find_room_with_key(self, key_id: int) -> Optional[int]:
         """Find room ID that contains the specified key"""
-        for room_id, room in self.env.rooms.items():
-            if room.has_key and room.key_id == key_id:
-                return room_id
-        return None
+        return self.env.key_to_room.get(key_id)
     
     def find_priority_target(self) -> Optional[int]:
         """
@@ -66,22 +68,23 @@ class AISolver:
         Priority: Keys -> Exit -> Exploration
         """
         # Priority 1: Find nearest key
+        has_key = self.agent.has_key
         for key_id in range(1, self.env.total_keys + 1):
-            if key_id not in self.agent.keys_collected:
+            if not has_key(key_id):
                 key_room_id = self.find_room_with_key(key_id)
                 if key_room_id is not None:
                     return key_room_id
         
         # Priority 2: Go to exit if all keys collected
-        if len(self.agent.keys_collected) >= self.env.total_keys:
+        if self.agent.has_all_keys():
             return self.env.exit_room_id
         
-        # Priority 3: Explore unknown safe rooms
-        for room_id in range(self.env.room_count):
-            if room_id not in self.agent.rooms_visited:
-                trap_prob = self.agent.belief_system.get_trap_probability(room_id)
-                if trap_prob < self.risk_tolerance:
-                    return room_id
+        # Priority 3: Explore unknown safe rooms (one snapshot of all beliefs)
+        trap_probs = self.agent.belief_system.get_trap_probabilities()
+        rooms_visited_mask = self.agent.rooms_visited_mask
+        for room_id, trap_prob in enumerate(trap_probs):
+            if trap_prob < self.risk_tolerance and not rooms_visited_mask >> room_id & 1:
+                return room_id
         
         return None
     
@@ -99,32 +102,37 @@ class AISolver:
             path = self.agent.find_path_bfs(start_room, target_room_id)
         
         if not path:
-            self.log(f"❌ No path found to Room {target_room_id}")
+            self.log("❌ No path found to Room %d", target_room_id)
             return False
         
+        # Bind per-step lookups once for the walk
+        agent, guard, log = self.agent, self.guard, self.log
+        graph_distance = self.env.graph_distance
+        steps = len(path) - 1
+        
         # Follow the path (skip first room as it's current location)
         for i, room_id in enumerate(path[1:], 1):
             if self.game_over:
                 break
                 
-            self.log(f"  → Moving to Room {room_id} (step {i}/{len(path)-1})")
+            log("  → Moving to Room %d (step %d/%d)", room_id, i, steps)
             
             # Check if guard is nearby (avoid if possible)
-            guard_distance = abs(self.guard.current_room - room_id)
+            guard_distance = graph_distance(guard.current_room, room_id)
             if guard_distance <= 2:
-                self.log(f"  ⚠️  Guard nearby! Distance: {guard_distance}")
+                log("  ⚠️  Guard nearby! Distance: %d", guard_distance)
             
             # Execute the move
-            success, message = self.agent.move_to(room_id)
+            success, message = agent.move_to(room_id)
             if not success:
-                self.log(f"❌ Move failed: {message}")
+                log("❌ Move failed: %s", message)
                 return False
             
-            self.log(f"  ✅ {message}")
+            log("  ✅ %s", message)
             
             # Update guard position
-            guard_room, guard_message = self.guard.make_move(self.agent.current_room)
-            self.log(f"  🤖 Guard moved to Room {guard_room}: {guard_message}")
+            guard_room, guard_message = guard.make_move(agent.current_room)
+            log("  🤖 Guard moved to Room %d: %s", guard_room, guard_message)
             
             self.turn += 1
             if self.turn >= self.max_turns:
@@ -136,8 +144,8 @@ class AISolver:
             if self.check_victory():
                 return True
             
-            if self.agent.health <= 0:
-                self.log("💀 Agent died!")
+            if agent.health <= 0:
+                log("💀 Agent died!")
                 self.game_over = True
                 return False
         
@@ -152,7 +160,7 @@ class AISolver:
         if not room.has_puzzle or not room.puzzle:
             return True  # No puzzle to solve
         
-        self.log(f"🧩 Solving puzzle in {room.name}...")
+        self.log("🧩 Solving puzzle in %s...", room.name)
         
         # Generate or use existing puzzle
         puzzle = CSPPuzzle()
@@ -172,28 +180,26 @@ class AISolver:
         solve_time = time.time() - start_time
         
         if solution:
-            self.log(f"  ✅ Puzzle solved in {solve_time:.3f}s!")
+            self.log("  ✅ Puzzle solved in %.3fs!", solve_time)
             self.agent.puzzles_solved += 1
             
             # Mark puzzle as solved and unlock connections
             room.puzzle_solved = True
             
             # Unlock all doors from this room
-            for neighbor_id, is_locked in room.neighbors:
-                if is_locked:
-                    self.env.unlock_door_between(room_id, neighbor_id)
+            for neighbor_id in tuple(room.locked_neighbor_ids):
+                self.env.unlock_door_between(room_id, neighbor_id)
             
-            self.log(f"  🔓 Doors unlocked!")
+            self.log("  🔓 Doors unlocked!")
             return True
         else:
-            self.log(f"  ❌ Failed to solve puzzle (took {solve_time:.3f}s)")
+            self.log("  ❌ Failed to solve puzzle (took %.3fs)", solve_time)
             return False
     
     def check_victory(self) -> bool:
         """Check if game is won or lost"""
         # Victory condition: All keys collected and reached exit
-        if (len(self.agent.keys_collected) >= self.env.total_keys and 
-            self.agent.current_room == self.env.exit_room_id):
+        if self.agent.has_all_keys() and self.agent.current_room == self.env.exit_room_id:
             self.victory = True
             self.game_over = True
             self.log("🏆 VICTORY! Escape successful!")
@@ -217,20 +223,21 @@ class AISolver:
         print(f"Agent Position: Room {self.agent.current_room} ({self.env.get_room(self.agent.current_room).name})")
         print(f"Guard Position: Room {self.guard.current_room}")
         print(f"Health: {self.agent.health}/{self.config.AGENT_HEALTH}")
-        print(f"Keys Collected: {len(self.agent.keys_collected)}/{self.env.total_keys}")
+        print(f"Keys Collected: {self.agent.key_count()}/{self.env.total_keys}")
         print(f"Keys: {sorted(self.agent.keys_collected)}")
-        print(f"Rooms Visited: {len(self.agent.rooms_visited)}")
+        print(f"Rooms Visited: {self.agent.rooms_visited_count()}")
         print(f"Puzzles Solved: {self.agent.puzzles_solved}")
         print(f"Moves Made: {self.agent.moves_made}")
         
         # Show trap probabilities for nearby rooms
         print("\nTrap Probabilities (current area):")
         current_room = self.agent.current_room
+        get_trap_probability = self.agent.belief_system.get_trap_probability
         for room_id in range(max(0, current_room-2), min(self.env.room_count, current_room+3)):
             if room_id == current_room:
-                print(f"  Room {room_id}: {self.agent.belief_system.get_trap_probability(room_id):.3f} (CURRENT)")
+                print(f"  Room {room_id}: {get_trap_probability(room_id):.3f} (CURRENT)")
             else:
-                print(f"  Room {room_id}: {self.agent.belief_system.get_trap_probability(room_id):.3f}")
+                print(f"  Room {room_id}: {get_trap_probability(room_id):.3f}")
         print(f"{'='*50}\n")
     
     def solve_escape_room(self) -> bool:
@@ -262,7 +269,7 @@ class AISolver:
                 self.log("🎯 No valid targets found. Exploring...")
                 # Find any unvisited room
                 for room_id in range(self.env.room_count):
-                    if room_id not in self.agent.rooms_visited:
+                    if not self.agent.has_visited(room_id):
                         target = room_id
                         break
                 
@@ -270,7 +277,7 @@ class AISolver:
                     self.log("🏁 No more rooms to explore. Finished!")
                     break
             
-            self.log(f"🎯 Target: Room {target} ({self.env.get_room(target).name})")
+            self.log("🎯 Target: Room %d (%s)", target, self.env.get_room(target).name)
             
             # Navigate to target
             success = self.navigate_to_target(target)
@@ -293,10 +300,10 @@ class AISolver:
         print(f"Success: {'✅ YES' if self.victory else '❌ NO'}")
         print(f"Turns Used: {self.turn}/{self.max_turns}")
         print(f"Health Remaining: {self.agent.health}/{self.config.AGENT_HEALTH}")
-        print(f"Keys Collected: {len(self.agent.keys_collected)}/{self.env.total_keys}")
+        print(f"Keys Collected: {self.agent.key_count()}/{self.env.total_keys}")
         print(f"Puzzles Solved: {self.agent.puzzles_solved}")
         print(f"Total Moves: {self.agent.moves_made}")
-        print(f"Rooms Explored: {len(self.agent.rooms_visited)}")
+        print(f"Rooms Explored: {self.agent.rooms_visited_count()}")
         print(f"Traps Triggered: {self.agent.traps_triggered}")
         
         if self.victory:
@@ -329,13 +336,10 @@ def run_ai_solver(turns_to_show: int = 20):
         solver = AISolver(verbose=True)
         original_log = solver.log
         
-        def selective_log(message: str):
-            if "Turn" in message:
-                turn_num = int(message.split("Turn")[1].split("]")[0].strip())
-                if turn_num % turns_to_show == 0 or "🎯" in message or "🏆" in message or "💀" in message:
-                    original_log(message)
-            else:
-                original_log(message)
+        def selective_log(message: str, *args):
+            # Read the turn straight off the solver; key events always get through
+            if solver.turn % turns_to_show == 0 or "🎯" in message or "🏆" in message or "💀" in message:
+                original_log(message, *args)
         
         solver.log = selective_log
         return solver.solve_escape_room()
@@ -2,26 +2,54 @@
 Bayesian reasoning module for probabilistic trap detection
 """
 
-from typing import Dict, List
+import heapq
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 from config import Config
 
 
+# Propagation deltas indexed by hop distance from the observed room
+# (closer rooms move more; the observed room itself is never touched)
+_TRAP_DELTAS = (0.0, 0.1, 0.05)
+_SAFE_DELTAS = (0.0, -0.05, -0.025)
+PROPAGATION_RADIUS = len(_TRAP_DELTAS) - 1
+
+
 class BayesianBeliefSystem:
     """Maintains and updates probabilistic beliefs about trap locations"""
     
-    def __init__(self, num_rooms: int, config: Config = None):
+    __slots__ = ("config", "num_rooms", "trap_beliefs", "observations", "observed", "version", "nearby")
+    
+    def __init__(self, num_rooms: int, config: Config = None, distances: Optional[Sequence[int]] = None):
+        """
+        distances: optional flat num_rooms x num_rooms hop-count table (Environment.door_distances)
+        When omitted, rooms are treated as a line and distance is the difference in room IDs
+        """
         self.config = config or Config()
         self.num_rooms = num_rooms
         
-        # Belief state: probability that each room has a trap
-        self.trap_beliefs: Dict[int, float] = {}
+        # Belief state: probability that each room has a trap, indexed by room ID
+        self.trap_beliefs: List[float] = [self.config.INITIAL_TRAP_PROBABILITY] * num_rooms
         
-        # Initialize with prior probabilities
-        for room_id in range(num_rooms):
-            self.trap_beliefs[room_id] = self.config.INITIAL_TRAP_PROBABILITY
-            
         # Evidence collected
         self.observations: Dict[int, str] = {}  # room_id -> "safe" or "trap"
+        self.observed: List[bool] = [False] * num_rooms  # Flat mirror of observations keys
+        self.version = 0  # Bumped on every belief update
+        
+        # Rooms that receive propagated evidence: nearby[r] = ((room_id, hops), ...) within the radius
+        self.nearby: List[Tuple[Tuple[int, int], ...]] = [
+            self._rooms_near(room_id, distances) for room_id in range(num_rooms)
+        ]
+        
+    def _rooms_near(self, room_id: int, distances: Optional[Sequence[int]]) -> Tuple[Tuple[int, int], ...]:
+        """(other_room, hops) pairs for rooms 1..PROPAGATION_RADIUS hops from room_id"""
+        if distances is None:
+            low = max(0, room_id - PROPAGATION_RADIUS)
+            high = min(self.num_rooms, room_id + PROPAGATION_RADIUS + 1)
+            return tuple((other, abs(other - room_id)) for other in range(low, high) if other != room_id)
+            
+        base = room_id * self.num_rooms
+        return tuple((other, distances[base + other]) for other in range(self.num_rooms)
+                     if 1 <= distances[base + other] <= PROPAGATION_RADIUS)
         
     def update_belief(self, room_id: int, observation: str):
         """
@@ -33,10 +61,30 @@ class BayesianBeliefSystem:
             room_id: The room being observed
             observation: Either "safe" (no trap triggered) or "trap" (trap triggered)
         """
-        if room_id not in self.trap_beliefs:
+        if not 0 <= room_id < self.num_rooms:
             return
             
+        self._apply_observation(room_id, observation)
+        self.version += 1
+        
+    def update_beliefs(self, observations: Iterable[Tuple[int, str]]):
+        """
+        Apply several (room_id, observation) pairs in one call
+        Same result as calling update_belief on each in order, but version is bumped once
+        """
+        num_rooms = self.num_rooms
+        changed = False
+        for room_id, observation in observations:
+            if 0 <= room_id < num_rooms:
+                self._apply_observation(room_id, observation)
+                changed = True
+        if changed:
+            self.version += 1
+            
+    def _apply_observation(self, room_id: int, observation: str):
+        """Bayes update for one in-range room, followed by propagation to its neighbors"""
         self.observations[room_id] = observation
+        self.observed[room_id] = True
         
         # Prior probability
         prior = self.trap_beliefs[room_id]
@@ -73,53 +121,70 @@ class BayesianBeliefSystem:
         """
         Propagate belief updates to nearby rooms
         Traps tend to cluster, so observing a trap increases nearby room probabilities
+        A single sweep over the precomputed rooms within 2 hops
         """
         if observation == "trap":
-            # Increase probability of traps in nearby rooms
-            for room_id in self.trap_beliefs:
-                if room_id != observed_room and room_id not in self.observations:
-                    distance = abs(room_id - observed_room)
-                    if distance <= 2:
-                        # Closer rooms have higher probability increase
-                        increase = 0.1 * (1 / distance)
-                        self.trap_beliefs[room_id] = min(0.95, 
-                                                         self.trap_beliefs[room_id] + increase)
-                                                         
+            deltas = _TRAP_DELTAS  # Increase probability of traps in nearby rooms
         elif observation == "safe":
-            # Slightly decrease probability of traps in nearby rooms
-            for room_id in self.trap_beliefs:
-                if room_id != observed_room and room_id not in self.observations:
-                    distance = abs(room_id - observed_room)
-                    if distance <= 2:
-                        decrease = 0.05 * (1 / distance)
-                        self.trap_beliefs[room_id] = max(0.05,
-                                                         self.trap_beliefs[room_id] - decrease)
-                                                         
+            deltas = _SAFE_DELTAS  # Slightly decrease probability of traps in nearby rooms
+        else:
+            return
+            
+        beliefs = self.trap_beliefs
+        observed = self.observed
+        
+        for room_id, hops in self.nearby[observed_room]:
+            if not observed[room_id]:
+                belief = beliefs[room_id] + deltas[hops]
+                beliefs[room_id] = 0.05 if belief < 0.05 else 0.95 if belief > 0.95 else belief
+                
+    def copy(self) -> 'BayesianBeliefSystem':
+        """Independent copy of the beliefs; the read-only nearby table is shared"""
+        clone = BayesianBeliefSystem.__new__(BayesianBeliefSystem)
+        clone.config = self.config
+        clone.num_rooms = self.num_rooms
+        clone.trap_beliefs = self.trap_beliefs[:]
+        clone.observations = dict(self.observations)
+        clone.observed = self.observed[:]
+        clone.version = self.version
+        clone.nearby = self.nearby
+        return clone
+        
     def get_trap_probability(self, room_id: int) -> float:
         """Get current belief probability that room has a trap"""
-        return self.trap_beliefs.get(room_id, 0.0)
+        if 0 <= room_id < self.num_rooms:
+            return self.trap_beliefs[room_id]
+        return 0.0
+        
+    def get_trap_probabilities(self) -> List[float]:
+        """Get trap probabilities for all rooms as a list indexed by room ID (a copy)"""
+        return self.trap_beliefs[:]
+        
+    def get_path_probabilities(self, path: List[int]) -> List[float]:
+        """Trap probabilities for each room along a path, in path order (0.0 for invalid IDs)"""
+        beliefs, n = self.trap_beliefs, self.num_rooms
+        return [beliefs[room_id] if 0 <= room_id < n else 0.0 for room_id in path]
         
     def get_safest_rooms(self, room_ids: List[int], top_n: int = 3) -> List[int]:
         """Get the safest rooms from a list based on current beliefs"""
-        sorted_rooms = sorted(room_ids, key=lambda rid: self.trap_beliefs.get(rid, 1.0))
-        return sorted_rooms[:top_n]
+        beliefs, n = self.trap_beliefs, self.num_rooms
+        return heapq.nsmallest(top_n, room_ids, key=lambda rid: beliefs[rid] if 0 <= rid < n else 1.0)
         
     def get_riskiest_rooms(self, room_ids: List[int], top_n: int = 3) -> List[int]:
         """Get the riskiest rooms from a list based on current beliefs"""
-        sorted_rooms = sorted(room_ids, key=lambda rid: self.trap_beliefs.get(rid, 0.0), 
-                             reverse=True)
-        return sorted_rooms[:top_n]
+        return heapq.nlargest(top_n, room_ids, key=self.get_trap_probability)
         
     def estimate_path_risk(self, path: List[int]) -> float:
         """
         Estimate total risk of a path as sum of trap probabilities
         Lower is safer
         """
+        beliefs, observed, n = self.trap_beliefs, self.observed, self.num_rooms
         total_risk = 0.0
         for room_id in path:
             # Don't count rooms we've already observed
-            if room_id not in self.observations:
-                total_risk += self.trap_beliefs.get(room_id, 0.0)
+            if 0 <= room_id < n and not observed[room_id]:
+                total_risk += beliefs[room_id]
         return total_risk
         
     def get_belief_summary(self) -> str:
@@ -128,44 +193,52 @@ class BayesianBeliefSystem:
         summary.append("BAYESIAN BELIEF STATE (Trap Probabilities)")
         summary.append("="*50)
         
-        # Group by probability ranges
-        high_risk = []
-        medium_risk = []
-        low_risk = []
-        verified = []
-        
-        for room_id, prob in self.trap_beliefs.items():
-            if room_id in self.observations:
-                verified.append((room_id, prob, self.observations[room_id]))
-            elif prob > 0.6:
-                high_risk.append((room_id, prob))
-            elif prob > 0.3:
-                medium_risk.append((room_id, prob))
-            else:
-                low_risk.append((room_id, prob))
-                
+        beliefs = self.trap_beliefs
+        observed = self.observed
+        max_rows = self.config.BELIEF_SUMMARY_MAX_ROWS
+        
+        # Verified rooms come out in ID order; the rest are sorted once by descending risk
+        verified = [room_id for room_id in range(self.num_rooms) if observed[room_id]]
+        ranked = sorted((room_id for room_id in range(self.num_rooms) if not observed[room_id]),
+                        key=beliefs.__getitem__, reverse=True)
+        
+        # Group by probability ranges: cut points in the ranked list
+        high_end = 0
+        while high_end < len(ranked) and beliefs[ranked[high_end]] > 0.6:
+            high_end += 1
+        medium_end = high_end
+        while medium_end < len(ranked) and beliefs[ranked[medium_end]] > 0.3:
+            medium_end += 1
+            
         if verified:
             summary.append("\nVERIFIED (Observed):")
-            for room_id, prob, obs in sorted(verified):
-                status = "HAS TRAP" if obs == "trap" else "SAFE"
-                summary.append(f"  Room {room_id}: {status} (P={prob:.2f})")
+            for room_id in verified:
+                status = "HAS TRAP" if self.observations[room_id] == "trap" else "SAFE"
+                summary.append(f"  Room {room_id}: {status} (P={beliefs[room_id]:.2f})")
                 
-        if high_risk:
+        if high_end:
             summary.append("\nHIGH RISK (P > 0.6):")
-            for room_id, prob in sorted(high_risk, key=lambda x: x[1], reverse=True):
-                summary.append(f"  Room {room_id}: P={prob:.2f}")
+            self._append_ranked_rows(summary, ranked[:high_end], max_rows)
                 
-        if medium_risk:
+        if medium_end > high_end:
             summary.append("\nMEDIUM RISK (0.3 < P < 0.6):")
-            for room_id, prob in sorted(medium_risk, key=lambda x: x[1], reverse=True):
-                summary.append(f"  Room {room_id}: P={prob:.2f}")
+            self._append_ranked_rows(summary, ranked[high_end:medium_end], max_rows)
                 
+        low_risk = ranked[medium_end:]
+        
         # Only show a few low risk rooms
         if low_risk:
             summary.append(f"\nLOW RISK (P < 0.3): {len(low_risk)} rooms")
             
         summary.append("="*50 + "\n")
         return '\n'.join(summary)
+        
+    def _append_ranked_rows(self, summary: List[str], room_ids: List[int], max_rows: int):
+        """Append up to max_rows 'Room N: P=..' lines, noting how many were left out"""
+        for room_id in room_ids[:max_rows]:
+            summary.append(f"  Room {room_id}: P={self.trap_beliefs[room_id]:.2f}")
+        if len(room_ids) > max_rows:
+            summary.append(f"  ... and {len(room_ids) - max_rows} more")
 
 
 if __name__ == "__main__":
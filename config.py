@@ -31,10 +31,14 @@ class Config:
     # Bayesian Reasoning
     INITIAL_TRAP_PROBABILITY = 0.2  # Prior belief that a room has a trap
     OBSERVATION_RELIABILITY = 0.9  # How reliable are observations
+    BELIEF_SUMMARY_MAX_ROWS = 10  # Rooms listed per risk group in the belief summary
     
     # Agent Settings
     AGENT_HEALTH = 100
     SEARCH_ALGORITHM = "astar"  # Options: "bfs", "dfs", "astar"
+    PATH_CACHE_SIZE = 512  # Max cached paths per agent (LRU)
+    ALL_PAIRS_MAX_ROOMS = 200  # BFS paths come from a precomputed table up to this many rooms
+    BIDIRECTIONAL_BFS_MIN_ROOMS = 32  # find_path_bfs searches from both ends on maps this large
     
     # Display
     SHOW_FULL_MAP = False  # If True, shows all rooms; if False, fog of war
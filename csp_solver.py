@@ -6,14 +6,39 @@ import random
 from typing import List, Dict, Set, Tuple, Optional, Callable
 
 
+# Constraint opcodes for the integer-coded solver path
+# Each coded constraint is (opcode, target, variable indices)
+OP_SUM_EQ = 0      # sum of the variables == target
+OP_ALL_DIFF = 1    # assigned variables take distinct values
+OP_LESS = 2        # first < second
+OP_PRODUCT_EQ = 3  # product of the variables == target
+OP_LEQ = 4         # first <= second
+
+UNASSIGNED = -1  # Sentinel in the flat value list (domains are positive)
+
+# Valid hard-puzzle combinations: W*X products and Y+Z sums
+# (W, X, Y, Z, target_product, target_sum)
+HARD_COMBINATIONS = (
+    (2, 6, 1, 5, 12, 6),  # W=2, X=6, Y=1, Z=5: 2*6=12, 1+5=6
+    (3, 4, 1, 5, 12, 6),  # W=3, X=4, Y=1, Z=5: 3*4=12, 1+5=6
+    (2, 5, 1, 6, 10, 7),  # W=2, X=5, Y=1, Z=6: 2*5=10, 1+6=7
+    (3, 5, 1, 4, 15, 5),  # W=3, X=5, Y=1, Z=4: 3*5=15, 1+4=5
+    (4, 5, 1, 3, 20, 4),  # W=4, X=5, Y=1, Z=3: 4*5=20, 1+3=4
+)
+
+
 class CSPPuzzle:
     """Represents a CSP puzzle for unlocking doors"""
     
+    __slots__ = ("difficulty", "variables", "domains", "constraints", "constraint_codes",
+                 "solution", "description")
+    
     def __init__(self, difficulty: str = "easy"):
         self.difficulty = difficulty
         self.variables: List[str] = []
         self.domains: Dict[str, List[int]] = {}
         self.constraints: List[Callable] = []
+        self.constraint_codes: List[Tuple[int, int, Tuple[int, ...]]] = []  # Same rules, integer-coded
         self.solution: Dict[str, int] = {}
         self.description = ""
         
@@ -53,6 +78,7 @@ class CSPPuzzle:
             return True
             
         self.constraints = [constraint_sum, constraint_different]
+        self.constraint_codes = [(OP_SUM_EQ, target_sum, (0, 1)), (OP_ALL_DIFF, 0, (0, 1))]
         self.description = f"[EASY PUZZLE] Find X and Y where:\n  - X + Y = {target_sum}\n  - X ≠ Y\n  - Both are between 1-4"
         
     def _generate_medium_puzzle(self):
@@ -81,6 +107,11 @@ class CSPPuzzle:
             return True
             
         self.constraints = [constraint_sum, constraint_all_different, constraint_order]
+        self.constraint_codes = [
+            (OP_SUM_EQ, target_sum, (0, 1, 2)),
+            (OP_ALL_DIFF, 0, (0, 1, 2)),
+            (OP_LESS, 0, (0, 1)),
+        ]
         self.description = f"[MEDIUM PUZZLE] Find A, B, C where:\n  - A + B + C = {target_sum}\n  - All different values\n  - A < B\n  - Each is between 1-5"
         
     def _generate_hard_puzzle(self):
@@ -93,17 +124,8 @@ class CSPPuzzle:
             "Z": [1, 2, 3, 4, 5, 6]
         }
         
-        # Generate a valid solution first to ensure solvability
-        # Valid combinations: W*X products and Y+Z sums
-        valid_combinations = [
-            (2, 6, 1, 5, 12, 6),  # W=2, X=6, Y=1, Z=5: 2*6=12, 1+5=6
-            (3, 4, 1, 5, 12, 6),  # W=3, X=4, Y=1, Z=5: 3*4=12, 1+5=6
-            (2, 5, 1, 6, 10, 7),  # W=2, X=5, Y=1, Z=6: 2*5=10, 1+6=7
-            (3, 5, 1, 4, 15, 5),  # W=3, X=5, Y=1, Z=4: 3*5=15, 1+4=5
-            (4, 5, 1, 3, 20, 4),  # W=4, X=5, Y=1, Z=3: 4*5=20, 1+3=4
-        ]
-        
-        w_val, x_val, y_val, z_val, target_product, target_sum = random.choice(valid_combinations)
+        # Pick a valid solution first to ensure solvability
+        w_val, x_val, y_val, z_val, target_product, target_sum = random.choice(HARD_COMBINATIONS)
         
         def constraint_product_sum(assignment):
             if all(v in assignment for v in ["W", "X", "Y", "Z"]):
@@ -121,6 +143,12 @@ class CSPPuzzle:
             return True
             
         self.constraints = [constraint_product_sum, constraint_all_different, constraint_ordering]
+        self.constraint_codes = [
+            (OP_PRODUCT_EQ, target_product, (0, 1)),
+            (OP_SUM_EQ, target_sum, (2, 3)),
+            (OP_ALL_DIFF, 0, (0, 1, 2, 3)),
+            (OP_LEQ, 0, (0, 1)),
+        ]
         self.description = f"[HARD PUZZLE] Find W, X, Y, Z where:\n  - W × X = {target_product}\n  - Y + Z = {target_sum}\n  - All different values\n  - W ≤ X\n  - Each is between 1-6"
 
 
@@ -136,10 +164,40 @@ class CSPSolver:
         """Solve the CSP using backtracking"""
         self.backtracks = 0
         self.nodes_expanded = 0
+        
+        # Integer-coded fast path: flat value list instead of a dict + closures
+        if self.puzzle.constraint_codes:
+            values = [UNASSIGNED] * len(self.puzzle.variables)
+            if self._backtrack_coded(values):
+                return dict(zip(self.puzzle.variables, values))
+            return None
+            
         assignment = {}
         result = self._backtrack(assignment)
         return result
         
+    def _backtrack_coded(self, values: List[int]) -> bool:
+        """Backtracking over the flat value list; fills values in place on success"""
+        self.nodes_expanded += 1
+        
+        if UNASSIGNED not in values:
+            return _check_codes(self.puzzle.constraint_codes, values)
+            
+        index = values.index(UNASSIGNED)
+        
+        for value in self.puzzle.domains[self.puzzle.variables[index]]:
+            values[index] = value
+            
+            if _check_codes(self.puzzle.constraint_codes, values):
+                if self._backtrack_coded(values):
+                    return True
+                    
+            # Backtrack
+            self.backtracks += 1
+            values[index] = UNASSIGNED
+            
+        return False
+        
     def _backtrack(self, assignment: Dict[str, int]) -> Optional[Dict[str, int]]:
         """Recursive backtracking with forward checking"""
         self.nodes_expanded += 1
@@ -179,6 +237,11 @@ class CSPSolver:
         
     def _is_consistent(self, assignment: Dict[str, int]) -> bool:
         """Check if current assignment satisfies all constraints"""
+        # Coded puzzles: check the same rules the solver uses
+        if self.puzzle.constraint_codes:
+            values = [assignment.get(var, UNASSIGNED) for var in self.puzzle.variables]
+            return _check_codes(self.puzzle.constraint_codes, values)
+            
         for constraint in self.puzzle.constraints:
             if not constraint(assignment):
                 return False
@@ -198,6 +261,51 @@ class CSPSolver:
         return self._is_consistent(user_solution)
 
 
+def _check_codes(codes: List[Tuple[int, int, Tuple[int, ...]]], values: List[int]) -> bool:
+    """
+    Check integer-coded constraints against a partial assignment
+    Arithmetic and ordering constraints only apply once all their variables are assigned
+    """
+    for op, target, indices in codes:
+        if op == OP_ALL_DIFF:
+            seen = set()
+            for i in indices:
+                value = values[i]
+                if value != UNASSIGNED:
+                    if value in seen:
+                        return False
+                    seen.add(value)
+        elif op == OP_SUM_EQ:
+            total = 0
+            for i in indices:
+                value = values[i]
+                if value == UNASSIGNED:
+                    break
+                total += value
+            else:
+                if total != target:
+                    return False
+        elif op == OP_PRODUCT_EQ:
+            product = 1
+            for i in indices:
+                value = values[i]
+                if value == UNASSIGNED:
+                    break
+                product *= value
+            else:
+                if product != target:
+                    return False
+        else:
+            first = values[indices[0]]
+            second = values[indices[1]]
+            if first != UNASSIGNED and second != UNASSIGNED:
+                if op == OP_LESS and not first < second:
+                    return False
+                if op == OP_LEQ and not first <= second:
+                    return False
+    return True
+
+
 def generate_puzzle(difficulty: str) -> CSPPuzzle:
     """Generate a new puzzle of specified difficulty"""
     return CSPPuzzle(difficulty)
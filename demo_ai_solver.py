@@ -45,7 +45,9 @@ def run_ai_with_summary():
     solver = AISolver(verbose=True)
     original_log = solver.log
     
-    def smart_log(message: str):
+    def smart_log(message: str, *args):
+        if args:
+            message = message % args
         # Show key decisions and events
         if any(keyword in message for keyword in [
             "🎯 Target:", "🧩 Solving puzzle", "✅ Puzzle solved", 
@@ -98,12 +100,12 @@ def compare_strategies():
             "success": success,
             "turns": solver.turn,
             "health": solver.agent.health,
-            "keys": len(solver.agent.keys_collected),
+            "keys": solver.agent.key_count(),
             "time": elapsed
         })
         
         print(f"Result: {'✅ Success' if success else '❌ Failed'}")
-        print(f"Turns: {solver.turn}, Health: {solver.agent.health}, Keys: {len(solver.agent.keys_collected)}")
+        print(f"Turns: {solver.turn}, Health: {solver.agent.health}, Keys: {solver.agent.key_count()}")
         print(f"Time: {elapsed:.2f}s")
     
     # Summary
@@ -4,13 +4,33 @@ Includes room graph, keys, traps, and puzzles
 """
 
 import random
+from array import array
+from collections import deque
 from typing import Dict, List, Set, Tuple, Optional
 from config import Config
 
 
+UNREACHABLE = 999  # Distance reported when no unlocked path exists
+
+# Display names by room ID, shared by every Environment (IDs past the end get "Room N")
+ROOM_NAMES = (
+    "Entrance Hall", "Storage Room", "Library", "Armory",
+    "Kitchen", "Dungeon", "Guard Room", "Treasury",
+    "Laboratory", "Chapel", "Throne Room", "Garden",
+    "Tower", "Cellar", "Study", "Gallery",
+    "Chamber", "Vault", "Courtyard", "Crypt",
+    "Workshop", "Barracks", "Dining Hall", "Prison",
+    "Observatory", "Archive", "Forge", "Sanctuary",
+    "Quarters", "Hall of Mirrors"
+)
+
+
 class Room:
     """Represents a single room in the escape room"""
     
+    __slots__ = ("id", "name", "has_key", "key_id", "has_trap", "trap_triggered", "has_puzzle",
+                 "puzzle", "puzzle_solved", "visited", "is_exit", "neighbors", "locked_neighbor_ids")
+    
     def __init__(self, room_id: int, name: str):
         self.id = room_id
         self.name = name
@@ -24,16 +44,21 @@ class Room:
         self.visited = False
         self.is_exit = False
         self.neighbors: List[Tuple[int, bool]] = []  # (room_id, is_locked)
+        self.locked_neighbor_ids: List[int] = []  # Neighbors behind locked doors, kept in sync with neighbors
         
     def add_neighbor(self, room_id: int, is_locked: bool = False):
         """Add a neighboring room"""
-        self.neighbors.append([room_id, is_locked])
+        self.neighbors.append((room_id, is_locked))
+        if is_locked:
+            self.locked_neighbor_ids.append(room_id)
         
     def unlock_door(self, neighbor_id: int):
         """Unlock door to a neighbor"""
         for i, (nid, locked) in enumerate(self.neighbors):
             if nid == neighbor_id:
-                self.neighbors[i][1] = False
+                self.neighbors[i] = (nid, False)
+        if neighbor_id in self.locked_neighbor_ids:
+            self.locked_neighbor_ids.remove(neighbor_id)
                 
     def __repr__(self):
         return f"Room({self.id}: {self.name})"
@@ -44,12 +69,21 @@ class Environment:
     
     def __init__(self, config: Config = None):
         self.config = config or Config()
-        self.rooms: Dict[int, Room] = {}
+        self.rooms: List[Room] = []  # Indexed by room ID (IDs are 0..room_count-1)
         self.start_room_id = 0
         self.exit_room_id = None
         self.keys_collected = set()
         self.total_keys = self.config.NUM_KEYS
         self.room_count = self.config.get_room_count()
+        self.graph_version = 0  # Bumped whenever door lock state changes
+        
+        # All-pairs next-hop and distance tables, rebuilt lazily when graph_version moves
+        self.next_hop: Optional[array] = None
+        self.distances: Optional[array] = None
+        self._next_hop_version = -1
+        
+        # Per-room unlocked neighbor tuples, cleared when a door unlocks
+        self._neighbors_cache: Dict[int, Tuple[int, ...]] = {}
         
         # Initialize environment
         self._generate_rooms()
@@ -57,23 +91,14 @@ class Environment:
         self._place_keys()
         self._place_traps()
         self._place_puzzles()
+        self._build_adjacency()
+        self._compute_door_distances()
         
     def _generate_rooms(self):
         """Generate rooms based on configuration"""
-        room_names = [
-            "Entrance Hall", "Storage Room", "Library", "Armory", 
-            "Kitchen", "Dungeon", "Guard Room", "Treasury",
-            "Laboratory", "Chapel", "Throne Room", "Garden",
-            "Tower", "Cellar", "Study", "Gallery",
-            "Chamber", "Vault", "Courtyard", "Crypt",
-            "Workshop", "Barracks", "Dining Hall", "Prison",
-            "Observatory", "Archive", "Forge", "Sanctuary",
-            "Quarters", "Hall of Mirrors"
-        ]
-        
         for i in range(self.room_count):
-            name = room_names[i] if i < len(room_names) else f"Room {i}"
-            self.rooms[i] = Room(i, name)
+            name = ROOM_NAMES[i] if i < len(ROOM_NAMES) else f"Room {i}"
+            self.rooms.append(Room(i, name))
             
         # Set start and exit
         self.start_room_id = 0
@@ -89,44 +114,83 @@ class Environment:
         
     def _connect_rooms(self):
         """Create a connected graph of rooms"""
+        edges: Set[Tuple[int, int]] = set()  # (low_id, high_id) of every connection so far
+        
         # Create a path from start to exit (ensure solvability)
         for i in range(self.room_count - 1):
             self.rooms[i].add_neighbor(i + 1, is_locked=False)
             self.rooms[i + 1].add_neighbor(i, is_locked=False)
+            edges.add((i, i + 1))
             
         # Add additional connections for complexity
         additional_edges = self.room_count // 3
         for _ in range(additional_edges):
             room1 = random.randint(0, self.room_count - 1)
             room2 = random.randint(0, self.room_count - 1)
+            edge = (room1, room2) if room1 < room2 else (room2, room1)
             
-            if room1 != room2 and not self._are_neighbors(room1, room2):
+            if room1 != room2 and edge not in edges:
                 # Some doors are locked
                 is_locked = random.random() < 0.4
                 self.rooms[room1].add_neighbor(room2, is_locked=is_locked)
                 self.rooms[room2].add_neighbor(room1, is_locked=is_locked)
+                edges.add(edge)
                 
-    def _are_neighbors(self, room1_id: int, room2_id: int) -> bool:
-        """Check if two rooms are already connected"""
-        return any(nid == room2_id for nid, _ in self.rooms[room1_id].neighbors)
+    def _build_adjacency(self):
+        """
+        Flatten Room.neighbors into CSR arrays
+        Neighbors of room r are adj_nodes[adj_ptr[r]:adj_ptr[r + 1]], with lock flags in adj_locked
+        """
+        self.adj_ptr = array('i', [0])
+        self.adj_nodes = array('i')
+        self.adj_locked = array('b')
+        
+        for room_id in range(self.room_count):
+            for neighbor_id, is_locked in self.rooms[room_id].neighbors:
+                self.adj_nodes.append(neighbor_id)
+                self.adj_locked.append(is_locked)
+            self.adj_ptr.append(len(self.adj_nodes))
+            
+    def _compute_door_distances(self):
+        """
+        Hop counts between every pair of rooms through any door, locked or not
+        door_distances[u * N + v] is the physical distance used for trap-belief propagation
+        (graph_distance is the separate, unlocked-only travel distance)
+        """
+        n = self.room_count
+        door_distances = array('B', [255]) * (n * n)
+        
+        for source in range(n):
+            base = source * n
+            door_distances[base + source] = 0
+            queue = deque([source])
+            while queue:
+                current = queue.popleft()
+                next_distance = min(door_distances[base + current] + 1, 254)
+                for i in range(self.adj_ptr[current], self.adj_ptr[current + 1]):
+                    neighbor = self.adj_nodes[i]
+                    if door_distances[base + neighbor] == 255:
+                        door_distances[base + neighbor] = next_distance
+                        queue.append(neighbor)
+                        
+        self.door_distances = door_distances
         
     def _place_keys(self):
         """Place keys in random rooms (not start or exit)"""
-        available_rooms = list(range(1, self.room_count - 1))
-        random.shuffle(available_rooms)
+        available_rooms = range(1, self.room_count - 1)
+        key_rooms = random.sample(available_rooms, min(self.config.NUM_KEYS, len(available_rooms)))
+        self.key_to_room: Dict[int, int] = {}
         
-        for i in range(min(self.config.NUM_KEYS, len(available_rooms))):
-            room_id = available_rooms[i]
+        for i, room_id in enumerate(key_rooms):
             self.rooms[room_id].has_key = True
             self.rooms[room_id].key_id = i
+            self.key_to_room[i] = room_id
             
     def _place_traps(self):
         """Place hidden traps in random rooms"""
-        available_rooms = list(range(1, self.room_count - 1))
-        random.shuffle(available_rooms)
+        available_rooms = range(1, self.room_count - 1)
         
-        for i in range(min(self.config.NUM_TRAPS, len(available_rooms))):
-            room_id = available_rooms[i]
+        for room_id in random.sample(available_rooms, min(self.config.NUM_TRAPS, len(available_rooms))):
             if not self.rooms[room_id].has_key:  # Don't put trap in key rooms
                 self.rooms[room_id].has_trap = True
                 
@@ -134,21 +198,26 @@ class Environment:
         """Place puzzles on locked doors"""
         # Find locked doors and assign puzzles
         puzzle_count = 0
-        for room_id, room in self.rooms.items():
-            for neighbor_id, is_locked in room.neighbors:
-                if is_locked:
-                    room.has_puzzle = True
-                    puzzle_count += 1
-                    break  # One puzzle per room is enough
+        for room in self.rooms:
+            if room.locked_neighbor_ids:
+                room.has_puzzle = True  # One puzzle per room is enough
+                puzzle_count += 1
                     
     def get_room(self, room_id: int) -> Optional[Room]:
         """Get room by ID"""
-        return self.rooms.get(room_id)
+        if 0 <= room_id < len(self.rooms):
+            return self.rooms[room_id]
+        return None
         
-    def get_unlocked_neighbors(self, room_id: int) -> List[int]:
-        """Get list of accessible neighbor room IDs"""
-        room = self.rooms[room_id]
-        return [nid for nid, locked in room.neighbors if not locked]
+    def get_unlocked_neighbors(self, room_id: int) -> Tuple[int, ...]:
+        """Get accessible neighbor room IDs (cached until a door unlocks)"""
+        neighbors = self._neighbors_cache.get(room_id)
+        if neighbors is None:
+            nodes, locked = self.adj_nodes, self.adj_locked
+            neighbors = tuple(nodes[i] for i in range(self.adj_ptr[room_id], self.adj_ptr[room_id + 1])
+                              if not locked[i])
+            self._neighbors_cache[room_id] = neighbors
+        return neighbors
         
     def get_all_neighbors(self, room_id: int) -> List[Tuple[int, bool]]:
         """Get all neighbors with lock status"""
@@ -158,7 +227,107 @@ class Environment:
         """Unlock door between two rooms"""
         self.rooms[room1_id].unlock_door(room2_id)
         self.rooms[room2_id].unlock_door(room1_id)
+        self._unlock_adjacency(room1_id, room2_id)
+        self._unlock_adjacency(room2_id, room1_id)
+        self._neighbors_cache.pop(room1_id, None)
+        self._neighbors_cache.pop(room2_id, None)
+        self.graph_version += 1
+        
+    def snapshot(self) -> Tuple[bytes, frozenset, array]:
+        """
+        Capture the state that play changes: per-room visited/trap/puzzle flags,
+        collected keys and door locks. Pass the result to restore() to roll back
+        """
+        flags = bytes(room.visited | room.trap_triggered << 1 | room.puzzle_solved << 2 for room in self.rooms)
+        return flags, frozenset(self.keys_collected), array('b', self.adj_locked)
         
+    def restore(self, state: Tuple[bytes, frozenset, array]):
+        """Roll back to a snapshot() taken from this environment"""
+        flags, keys_collected, adj_locked = state
+        for room, flag in zip(self.rooms, flags):
+            room.visited = bool(flag & 1)
+            room.trap_triggered = bool(flag & 2)
+            room.puzzle_solved = bool(flag & 4)
+        self.keys_collected = set(keys_collected)
+        
+        if adj_locked == self.adj_locked:
+            return
+            
+        # Relock doors: rebuild each room's neighbor list from the saved CSR lock flags
+        nodes, ptr = self.adj_nodes, self.adj_ptr
+        for room_id, room in enumerate(self.rooms):
+            edges = range(ptr[room_id], ptr[room_id + 1])
+            room.neighbors = [(nodes[i], bool(adj_locked[i])) for i in edges]
+            room.locked_neighbor_ids = [nodes[i] for i in edges if adj_locked[i]]
+        self.adj_locked = array('b', adj_locked)
+        self._neighbors_cache.clear()
+        self.graph_version += 1  # Never reuse a version: path caches are keyed on it
+        
+    def compute_all_pairs(self):
+        """
+        Run BFS from every room and fill flat V*V next-hop and distance tables
+        next_hop[u * V + v] is the first room on a shortest u → v path, -1 if unreachable
+        distances[u * V + v] is the hop count of that path, UNREACHABLE if none
+        """
+        n = self.room_count
+        next_hop = array('i', [-1]) * (n * n)
+        distances = array('i', [UNREACHABLE]) * (n * n)
+        
+        for source in range(n):
+            base = source * n
+            next_hop[base + source] = source
+            distances[base + source] = 0
+            queue = deque()
+            
+            for neighbor in self.get_unlocked_neighbors(source):
+                if next_hop[base + neighbor] == -1:
+                    next_hop[base + neighbor] = neighbor
+                    distances[base + neighbor] = 1
+                    queue.append(neighbor)
+                    
+            while queue:
+                current = queue.popleft()
+                first_step = next_hop[base + current]
+                next_distance = distances[base + current] + 1
+                for neighbor in self.get_unlocked_neighbors(current):
+                    if next_hop[base + neighbor] == -1:
+                        next_hop[base + neighbor] = first_step
+                        distances[base + neighbor] = next_distance
+                        queue.append(neighbor)
+                        
+        self.next_hop = next_hop
+        self.distances = distances
+        self._next_hop_version = self.graph_version
+        
+    def graph_distance(self, room1_id: int, room2_id: int) -> int:
+        """Hop count between two rooms over unlocked doors, UNREACHABLE if none"""
+        if self._next_hop_version != self.graph_version:
+            self.compute_all_pairs()
+        return self.distances[room1_id * self.room_count + room2_id]
+        
+    def shortest_path(self, start: int, goal: int) -> Optional[List[int]]:
+        """Shortest path by hop count using the all-pairs table, or None if unreachable"""
+        if self._next_hop_version != self.graph_version:
+            self.compute_all_pairs()
+            
+        n = self.room_count
+        next_hop = self.next_hop
+        if next_hop[start * n + goal] == -1:
+            return None
+            
+        path = [start]
+        current = start
+        while current != goal:
+            current = next_hop[current * n + goal]
+            path.append(current)
+        return path
+        
+    def _unlock_adjacency(self, room_id: int, neighbor_id: int):
+        """Clear the CSR lock flag for the edge room_id → neighbor_id"""
+        for i in range(self.adj_ptr[room_id], self.adj_ptr[room_id + 1]):
+            if self.adj_nodes[i] == neighbor_id:
+                self.adj_locked[i] = False
+                
     def collect_key(self, room_id: int) -> bool:
         """Collect key from room if present"""
         room = self.rooms[room_id]
@@ -13,6 +13,21 @@ from csp_solver import CSPPuzzle, CSPSolver, generate_puzzle
 from bayesian_reasoning import BayesianBeliefSystem
 
 
+VALID_ACTIONS = frozenset({"1", "2", "3", "4", "5", "6", "7"})  # Menu choices accepted by get_player_action
+
+# Action menu, joined once so each turn prints it with a single write
+ACTION_MENU = '\n'.join([
+    "\n📋 AVAILABLE ACTIONS:",
+    "1. Move to adjacent room",
+    "2. Solve puzzle (if present)",
+    "3. Find path to nearest key",
+    "4. Plan escape route",
+    "5. View belief state (trap probabilities)",
+    "6. View guard status",
+    "7. Quit game",
+])
+
+
 class EscapeRoomGame:
     """Main game controller"""
     
@@ -30,31 +45,33 @@ class EscapeRoomGame:
         
     def start(self):
         """Start the game"""
-        print("\n" + "="*70)
-        print("🎮 WELCOME TO AI ESCAPE ROOM 🎮")
-        print("="*70)
-        print("\n📖 STORY:")
-        print("You are trapped in a mysterious escape room complex.")
-        print("Navigate through locked rooms, solve puzzles, avoid traps,")
-        print("and escape before the guard catches you!")
-        print("\n🎯 OBJECTIVE:")
-        print(f"- Collect all {self.env.total_keys} keys")
-        print(f"- Reach Room {self.env.exit_room_id} (Exit)")
-        print("- Survive! (Don't let health reach 0)")
-        print("- Avoid the guard!")
-        print("\n🤖 AI TECHNIQUES USED:")
-        print("- Search Algorithms (BFS/A*) for pathfinding")
-        print("- CSP Solver for puzzle solving")
-        print("- Minimax for adversarial guard AI")
-        print("- Bayesian Reasoning for trap prediction")
-        print("="*70)
+        # Build the whole banner and write it in one print
+        lines = ["\n" + "="*70]
+        lines.append("🎮 WELCOME TO AI ESCAPE ROOM 🎮")
+        lines.append("="*70)
+        lines.append("\n📖 STORY:")
+        lines.append("You are trapped in a mysterious escape room complex.")
+        lines.append("Navigate through locked rooms, solve puzzles, avoid traps,")
+        lines.append("and escape before the guard catches you!")
+        lines.append("\n🎯 OBJECTIVE:")
+        lines.append(f"- Collect all {self.env.total_keys} keys")
+        lines.append(f"- Reach Room {self.env.exit_room_id} (Exit)")
+        lines.append("- Survive! (Don't let health reach 0)")
+        lines.append("- Avoid the guard!")
+        lines.append("\n🤖 AI TECHNIQUES USED:")
+        lines.append("- Search Algorithms (BFS/A*) for pathfinding")
+        lines.append("- CSP Solver for puzzle solving")
+        lines.append("- Minimax for adversarial guard AI")
+        lines.append("- Bayesian Reasoning for trap prediction")
+        lines.append("="*70)
         
-        print(self.env.get_map_summary())
-        print("\n🎲 Environment Generated:")
-        print(f"   Total Rooms: {self.env.room_count}")
-        print(f"   Hidden Traps: {self.config.NUM_TRAPS}")
-        print(f"   Keys to Find: {self.config.NUM_KEYS}")
-        print(f"   Guard: {'Enabled' if self.config.GUARD_ENABLED else 'Disabled'}")
+        lines.append(self.env.get_map_summary())
+        lines.append("\n🎲 Environment Generated:")
+        lines.append(f"   Total Rooms: {self.env.room_count}")
+        lines.append(f"   Hidden Traps: {self.config.NUM_TRAPS}")
+        lines.append(f"   Keys to Find: {self.config.NUM_KEYS}")
+        lines.append(f"   Guard: {'Enabled' if self.config.GUARD_ENABLED else 'Disabled'}")
+        print('\n'.join(lines))
         
         input("\n\nPress ENTER to begin your escape...")
         self.game_loop()
@@ -100,19 +117,12 @@ class EscapeRoomGame:
         
     def get_player_action(self) -> str:
         """Get player's chosen action"""
-        print("\n📋 AVAILABLE ACTIONS:")
-        print("1. Move to adjacent room")
-        print("2. Solve puzzle (if present)")
-        print("3. Find path to nearest key")
-        print("4. Plan escape route")
-        print("5. View belief state (trap probabilities)")
-        print("6. View guard status")
-        print("7. Quit game")
+        print(ACTION_MENU)
         
         while True:
             choice = input("\nChoose action (1-7): ").strip()
             
-            if choice in ["1", "2", "3", "4", "5", "6", "7"]:
+            if choice in VALID_ACTIONS:
                 return choice
             elif choice.lower() == "quit":
                 return "quit"
@@ -170,8 +180,8 @@ class EscapeRoomGame:
         """Action: Attempt to solve a puzzle"""
         current_room = self.env.get_room(self.agent.current_room)
         
-        # Check if current room has locked doors
-        locked_neighbors = [(nid, locked) for nid, locked in current_room.neighbors if locked]
+        # Check if current room has locked doors (snapshot, unlocking shrinks the room's list)
+        locked_neighbors = tuple(current_room.locked_neighbor_ids)
         
         if not locked_neighbors:
             print("\n❌ No locked doors in this room!")
@@ -208,11 +218,10 @@ class EscapeRoomGame:
             print(f"   Backtracks: {solver.backtracks}")
             
             # Unlock doors
-            for neighbor_id, locked in locked_neighbors:
-                if locked:
-                    self.env.unlock_door_between(self.agent.current_room, neighbor_id)
-                    neighbor = self.env.get_room(neighbor_id)
-                    print(f"   🔓 Unlocked door to Room {neighbor_id}: {neighbor.name}")
+            for neighbor_id in locked_neighbors:
+                self.env.unlock_door_between(self.agent.current_room, neighbor_id)
+                neighbor = self.env.get_room(neighbor_id)
+                print(f"   🔓 Unlocked door to Room {neighbor_id}: {neighbor.name}")
                     
             self.agent.puzzles_solved += 1
             print(f"\n✅ Puzzle solved! Doors unlocked.")
@@ -252,16 +261,16 @@ class EscapeRoomGame:
         print(f"   Distance: {len(path) - 1} rooms")
         
         # Estimate risk
-        risk = self.agent.belief_system.estimate_path_risk(path)
+        belief_system = self.agent.belief_system
+        risk = belief_system.estimate_path_risk(path)
         print(f"   Estimated risk: {risk:.2f}")
         
-        # Show room details
-        print("\n   Route details:")
-        for i, room_id in enumerate(path):
-            room = self.env.get_room(room_id)
-            trap_prob = self.agent.belief_system.get_trap_probability(room_id)
+        # Show room details (probabilities fetched for the whole route at once)
+        lines = ["\n   Route details:"]
+        for i, (room_id, trap_prob) in enumerate(zip(path, belief_system.get_path_probabilities(path))):
             risk_label = "🔴" if trap_prob > 0.6 else "🟡" if trap_prob > 0.3 else "🟢"
-            print(f"   {i+1}. Room {room_id}: {room.name} {risk_label}")
+            lines.append(f"   {i+1}. Room {room_id}: {self.env.get_room(room_id).name} {risk_label}")
+        print('\n'.join(lines))
             
     def action_view_beliefs(self):
         """Action: View Bayesian belief state"""
@@ -271,11 +280,10 @@ class EscapeRoomGame:
         """Action: View guard status"""
         print(self.guard.get_status())
         
-        if self.guard.can_see_player(self.agent.current_room):
+        distance = self.guard.player_distance(self.agent.current_room)
+        if distance <= self.config.GUARD_VISION_RANGE:
             print("⚠️  ALERT: Guard can detect your location!")
         else:
-            distance = self.guard._distance_to_room(self.guard.current_room, 
-                                                     self.agent.current_room)
             print(f"✅ Guard is {distance} rooms away")
             
     def check_game_end(self) -> bool:
@@ -312,29 +320,30 @@ class EscapeRoomGame:
         
     def end_game(self):
         """Display end game statistics"""
-        print("\n" + "="*70)
-        print("GAME OVER - FINAL STATISTICS")
-        print("="*70)
+        lines = ["\n" + "="*70]
+        lines.append("GAME OVER - FINAL STATISTICS")
+        lines.append("="*70)
         
         if self.victory:
-            print("🏆 Result: VICTORY! You escaped successfully!")
+            lines.append("🏆 Result: VICTORY! You escaped successfully!")
         else:
-            print("💀 Result: DEFEAT")
+            lines.append("💀 Result: DEFEAT")
             
-        print(f"\n📊 Agent Performance:")
-        print(f"   Turns taken: {self.turn}")
-        print(f"   Moves made: {self.agent.moves_made}")
-        print(f"   Final health: {self.agent.health}/{self.config.AGENT_HEALTH}")
-        print(f"   Keys collected: {len(self.agent.keys_collected)}/{self.env.total_keys}")
-        print(f"   Rooms explored: {len(self.agent.rooms_visited)}/{self.env.room_count}")
-        print(f"   Traps triggered: {self.agent.traps_triggered}")
-        print(f"   Puzzles solved: {self.agent.puzzles_solved}")
+        lines.append(f"\n📊 Agent Performance:")
+        lines.append(f"   Turns taken: {self.turn}")
+        lines.append(f"   Moves made: {self.agent.moves_made}")
+        lines.append(f"   Final health: {self.agent.health}/{self.config.AGENT_HEALTH}")
+        lines.append(f"   Keys collected: {self.agent.key_count()}/{self.env.total_keys}")
+        lines.append(f"   Rooms explored: {self.agent.rooms_visited_count()}/{self.env.room_count}")
+        lines.append(f"   Traps triggered: {self.agent.traps_triggered}")
+        lines.append(f"   Puzzles solved: {self.agent.puzzles_solved}")
         
-        print(f"\n👮 Guard Performance:")
-        print(f"   Moves made: {self.guard.moves_made}")
-        print(f"   Final position: Room {self.guard.current_room}")
+        lines.append(f"\n👮 Guard Performance:")
+        lines.append(f"   Moves made: {self.guard.moves_made}")
+        lines.append(f"   Final position: Room {self.guard.current_room}")
         
-        print("="*70)
+        lines.append("="*70)
+        print('\n'.join(lines))
 
 
 def main():
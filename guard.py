@@ -5,7 +5,21 @@ Guard AI with Minimax adversarial search
 from typing import List, Tuple, Optional
 import random
 from config import Config
-from environment import Environment
+from environment import Environment, UNREACHABLE
+
+
+NEG_INF = float('-inf')  # Initial best value for the maximizing guard
+POS_INF = float('inf')  # Initial best value for the minimizing player
+
+
+def _distance_utility(distance: int) -> float:
+    """Guard utility for a guard-player distance (see Guard._evaluate_position)"""
+    if distance == 0:
+        return 100.0  # Guard caught player - maximum utility
+    if distance == UNREACHABLE:
+        return -50.0  # No path to player
+    # Inverse of distance (closer = better for guard), scaled to a reasonable range
+    return 50.0 / (distance + 1)
 
 
 class Guard:
@@ -22,35 +36,20 @@ class Guard:
         self.moves_made = 0
         self.player_caught = False
         
+    def player_distance(self, player_room: int) -> int:
+        """Distance from the guard's room to the player (999 if unreachable)"""
+        return self._distance_to_room(self.current_room, player_room)
+        
     def can_see_player(self, player_room: int) -> bool:
         """Check if guard can see/detect the player"""
-        distance = self._distance_to_room(self.current_room, player_room)
-        return distance <= self.config.GUARD_VISION_RANGE
+        return self.player_distance(player_room) <= self.config.GUARD_VISION_RANGE
         
     def _distance_to_room(self, from_room: int, to_room: int) -> int:
         """
-        Calculate approximate distance between rooms
-        Using simple BFS distance
+        Distance between rooms over unlocked doors (999 if unreachable)
+        Read from the environment's all-pairs table, rebuilt only when a door unlocks
         """
-        if from_room == to_room:
-            return 0
-            
-        from collections import deque
-        queue = deque([(from_room, 0)])
-        visited = {from_room}
-        
-        while queue:
-            current, dist = queue.popleft()
-            
-            for neighbor in self.env.get_unlocked_neighbors(current):
-                if neighbor == to_room:
-                    return dist + 1
-                    
-                if neighbor not in visited:
-                    visited.add(neighbor)
-                    queue.append((neighbor, dist + 1))
-                    
-        return 999  # No path found
+        return self.env.graph_distance(from_room, to_room)
         
     def make_move(self, player_room: int) -> Tuple[int, str]:
         """
@@ -73,14 +72,14 @@ class Guard:
                 self.player_caught = True
                 return self.current_room, f"👮 GUARD moved from Room {old_room} to Room {best_move} and CAUGHT THE PLAYER!"
             else:
-                distance = self._distance_to_room(self.current_room, player_room)
+                distance = self.player_distance(player_room)
                 return self.current_room, f"👮 Guard moved from Room {old_room} to Room {best_move} (distance to player: {distance})"
         else:
             return self.current_room, "Guard couldn't find a move"
             
     def _minimax_decision(self, player_room: int) -> Optional[int]:
         """
-        Make decision using Minimax algorithm
+        Make decision using Minimax with alpha-beta pruning
         Guard maximizes (wants to catch player - minimize distance)
         Player minimizes (wants to escape - maximize distance)
         """
@@ -89,64 +88,24 @@ class Guard:
         if not neighbors:
             return None
             
-        # Evaluate each possible move
+        # Evaluate each possible move, carrying alpha across siblings
         best_move = None
-        best_value = float('-inf')
+        best_value = NEG_INF
+        alpha = NEG_INF
         
         for neighbor in neighbors:
             # Simulate moving to this room
-            value = self._minimax(neighbor, player_room, self.config.MINIMAX_DEPTH - 1, False)
+            value = MinimaxAlphaBeta.minimax_alpha_beta(
+                self, neighbor, player_room, self.config.MINIMAX_DEPTH - 1, alpha, POS_INF, False
+            )
             
             if value > best_value:
                 best_value = value
                 best_move = neighbor
+            alpha = max(alpha, value)
                 
         return best_move
         
-    def _minimax(self, guard_room: int, player_room: int, depth: int, is_maximizing: bool) -> float:
-        """
-        Minimax algorithm with depth-limited search
-        
-        Args:
-            guard_room: Current guard position in simulation
-            player_room: Current player position
-            depth: Remaining search depth
-            is_maximizing: True if guard's turn, False if player's turn
-            
-        Returns:
-            Utility value (higher = better for guard)
-        """
-        # Terminal conditions
-        if depth == 0 or guard_room == player_room:
-            return self._evaluate_position(guard_room, player_room)
-            
-        if is_maximizing:
-            # Guard's turn - maximize
-            max_value = float('-inf')
-            neighbors = self.env.get_unlocked_neighbors(guard_room)
-            
-            if not neighbors:
-                return self._evaluate_position(guard_room, player_room)
-                
-            for neighbor in neighbors:
-                value = self._minimax(neighbor, player_room, depth - 1, False)
-                max_value = max(max_value, value)
-                
-            return max_value
-        else:
-            # Player's turn - minimize (from guard's perspective)
-            min_value = float('inf')
-            neighbors = self.env.get_unlocked_neighbors(player_room)
-            
-            if not neighbors:
-                return self._evaluate_position(guard_room, player_room)
-                
-            for neighbor in neighbors:
-                value = self._minimax(guard_room, neighbor, depth - 1, True)
-                min_value = min(min_value, value)
-                
-            return min_value
-            
     def _evaluate_position(self, guard_room: int, player_room: int) -> float:
         """
         Evaluate a position (utility function)
@@ -157,16 +116,21 @@ class Guard:
         if guard_room == player_room:
             return 100.0  # Guard caught player - maximum utility
             
-        distance = self._distance_to_room(guard_room, player_room)
+        return _distance_utility(self.env.graph_distance(guard_room, player_room))
         
-        if distance == 999:
-            return -50.0  # No path to player
-            
-        # Inverse of distance (closer = better for guard)
-        # Scale to reasonable range
-        utility = 50.0 / (distance + 1)
+    def _utility_bounds(self, guard_room: int, player_room: int, depth: int) -> Tuple[float, float]:
+        """
+        Bounds on _evaluate_position anywhere in a subtree of the given depth
+        Each ply moves one side one room, so the distance changes by at most depth
+        """
+        distance = self.env.graph_distance(guard_room, player_room)
         
-        return utility
+        if distance == UNREACHABLE:
+            return -50.0, -50.0  # Doors don't unlock during the search
+            
+        lower = 50.0 / (distance + depth + 1)
+        upper = 100.0 if distance <= depth else 50.0 / (distance - depth + 1)
+        return lower, upper
         
     def get_status(self) -> str:
         """Get guard status"""
@@ -211,9 +175,24 @@ class MinimaxAlphaBeta:
             return guard._evaluate_position(guard_room, player_room)
             
         if is_maximizing:
-            max_value = float('-inf')
+            # Branch and bound: skip if even the best reachable position can't beat alpha
+            if alpha > NEG_INF:
+                upper = guard._utility_bounds(guard_room, player_room, depth)[1]
+                if upper <= alpha:
+                    return upper
+                    
+            max_value = NEG_INF
             neighbors = guard.env.get_unlocked_neighbors(guard_room)
             
+            if not neighbors:
+                return guard._evaluate_position(guard_room, player_room)
+                
+            # One ply above the leaves: utility only falls as distance grows, so the
+            # best guard move is the neighbor closest to the player
+            if depth == 1:
+                distance = guard.env.graph_distance
+                return _distance_utility(min(distance(neighbor, player_room) for neighbor in neighbors))
+                
             for neighbor in neighbors:
                 value = MinimaxAlphaBeta.minimax_alpha_beta(
                     guard, neighbor, player_room, depth - 1, alpha, beta, False
@@ -227,9 +206,24 @@ class MinimaxAlphaBeta:
                     
             return max_value
         else:
-            min_value = float('inf')
+            # Branch and bound: skip if even the worst reachable position stays above beta
+            if beta < POS_INF:
+                lower = guard._utility_bounds(guard_room, player_room, depth)[0]
+                if lower >= beta:
+                    return lower
+                    
+            min_value = POS_INF
             neighbors = guard.env.get_unlocked_neighbors(player_room)
             
+            if not neighbors:
+                return guard._evaluate_position(guard_room, player_room)
+                
+            # One ply above the leaves: the player's best reply is the neighbor farthest
+            # from the guard (unreachable counts as farthest)
+            if depth == 1:
+                distance = guard.env.graph_distance
+                return _distance_utility(max(distance(guard_room, neighbor) for neighbor in neighbors))
+                
             for neighbor in neighbors:
                 value = MinimaxAlphaBeta.minimax_alpha_beta(
                     guard, guard_room, neighbor, depth - 1, alpha, beta, True
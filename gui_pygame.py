@@ -6,18 +6,22 @@ Visual interface with room graph, agent/guard, and real-time AI visualization
 import pygame
 import sys
 import math
+from collections import deque, OrderedDict
 from typing import Dict, List, Tuple, Optional
 from config import Config
 from environment import Environment
 from agent import Agent
 from guard import Guard
-from game import EscapeRoomGame
 from csp_solver import generate_puzzle, CSPSolver
 from ai_solver import AISolver
 
 # Initialize Pygame
 pygame.init()
 
+TEXT_CACHE_MAX = 512  # Rendered text surfaces kept (least recently used are dropped)
+SHADOW_COLOR = (150, 150, 150)  # Drop shadow color for panels and text
+STATS_ROWS = 6  # Text lines in the agent status panel
+
 # Colors - Light theme with blue accents
 class Colors:
     # Base colors
@@ -66,6 +70,15 @@ class Colors:
     HEALTH_BAR_BG = (220, 220, 220)   # Light gray
 
 
+def darken(surface: pygame.Surface, rect, alpha: int):
+    """
+    Shade a region (Rect or (x, y, w, h)) as if black with the given alpha were blended over it
+    Multiplies the pixels in place, so no translucent Surface is needed
+    """
+    keep = 255 - alpha
+    surface.fill((keep, keep, keep), rect, special_flags=pygame.BLEND_RGB_MULT)
+
+
 class Button:
     """Interactive button"""
     
@@ -75,41 +88,49 @@ class Button:
         self.action = action
         self.hovered = False
         
-    def draw(self, surface: pygame.Surface, font: pygame.font.Font):
-        """Draw button with shadow effect"""
+        # Pre-rendered faces (shadow included), rebuilt only when the font changes
+        self._font: Optional[pygame.font.Font] = None
+        self._normal_surf: Optional[pygame.Surface] = None
+        self._hover_surf: Optional[pygame.Surface] = None
+        
+    def prerender(self, font: pygame.font.Font):
+        """Bake the normal and hover looks of the button into surfaces"""
+        self._font = font
+        self._normal_surf = self._render_face(font, False)
+        self._hover_surf = self._render_face(font, True)
+        
+    def _render_face(self, font: pygame.font.Font, hovered: bool) -> pygame.Surface:
+        """Draw the button at the origin of a transparent surface with room for its shadow"""
+        width, height = self.rect.size
+        face = pygame.Surface((width + 2, height + 2), pygame.SRCALPHA)
+        rect = pygame.Rect(0, 0, width, height)
+        
         # Draw shadow
-        shadow_rect = self.rect.copy()
-        shadow_rect.x += 2
-        shadow_rect.y += 2
-        pygame.draw.rect(surface, (150, 150, 150, 100), shadow_rect, border_radius=6)
+        pygame.draw.rect(face, (150, 150, 150), rect.move(2, 2), border_radius=6)
         
         # Choose color based on button type
-        if self.hovered:
-            color = Colors.BUTTON_HOVER
-        else:
-            color = Colors.BUTTON_NORMAL
+        color = Colors.BUTTON_HOVER if hovered else Colors.BUTTON_NORMAL
             
         # Draw button with rounded corners
-        pygame.draw.rect(surface, color, self.rect, border_radius=6)
-        pygame.draw.rect(surface, Colors.PRIMARY_BLUE, self.rect, 2, border_radius=6)
+        pygame.draw.rect(face, color, rect, border_radius=6)
+        pygame.draw.rect(face, Colors.PRIMARY_BLUE, rect, 2, border_radius=6)
         
         # Add subtle inner highlight
-        if not self.hovered:
-            inner_rect = self.rect.inflate(-4, -4)
-            pygame.draw.rect(surface, (255, 255, 255, 50), inner_rect, border_radius=4)
+        if not hovered:
+            pygame.draw.rect(face, (255, 255, 255), rect.inflate(-4, -4), border_radius=4)
         
         # Draw text with subtle shadow
         text_surface = font.render(self.text, True, Colors.TEXT_COLOR)
-        text_rect = text_surface.get_rect(center=self.rect.center)
+        text_rect = text_surface.get_rect(center=rect.center)
+        face.blit(font.render(self.text, True, SHADOW_COLOR), text_rect.move(1, 1))
+        face.blit(text_surface, text_rect)
+        return face.convert_alpha()  # Display pixel format for fast blits
         
-        # Text shadow
-        shadow_text_rect = text_rect.copy()
-        shadow_text_rect.x += 1
-        shadow_text_rect.y += 1
-        shadow_surface = font.render(self.text, True, (150, 150, 150))
-        surface.blit(shadow_surface, shadow_text_rect)
-        
-        surface.blit(text_surface, text_rect)
+    def draw(self, surface: pygame.Surface, font: pygame.font.Font):
+        """Draw button with shadow effect"""
+        if self._font is not font:
+            self.prerender(font)
+        surface.blit(self._hover_surf if self.hovered else self._normal_surf, self.rect)
         
     def handle_event(self, event: pygame.event.Event) -> bool:
         """Handle mouse events"""
@@ -148,16 +169,37 @@ class EscapeRoomGUI:
         self.clock = pygame.time.Clock()
         self.fps = 60
         
+        # Screen regions changed since the last display update
+        self._dirty_rects: List[pygame.Rect] = []
+        self._full_redraw = True
+        
         # Fonts
         self.font_large = pygame.font.Font(None, 36)
         self.font_medium = pygame.font.Font(None, 24)
         self.font_small = pygame.font.Font(None, 18)
         
+        # Rendered text: room number labels, plus (text, font, color) -> Surface for panel text
+        self._room_id_surfaces: List[pygame.Surface] = []
+        self._text_cache: OrderedDict = OrderedDict()
+        self._build_room_labels()
+        
+        # (color, radius, border) -> pre-drawn circle, for the fixed circle sizes on the map
+        self._circle_sprites: Dict[Tuple[Tuple[int, int, int], int, int], pygame.Surface] = {}
+        
         # Initialize room positions first
         self.room_positions: Dict[int, Tuple[int, int]] = {}
+        self._edges: List[Tuple[Tuple[int, int], Tuple[int, int], bool]] = []
+        self._edges_key = None  # (env, graph_version) the edge list was built for
         
         # UI elements
         self.buttons: List[Button] = []
+        self._legend_cache: Optional[pygame.Surface] = None  # Static, rebuilt after a layout change
+        self._background: Optional[pygame.Surface] = None  # Page, legend and panel chrome, per layout
+        self._puzzle_chrome: Optional[pygame.Surface] = None  # Puzzle dialog frame and fixed labels
+        self._game_over_dialog: Optional[pygame.Surface] = None
+        self._game_over_key = None  # (title, subtext) the game over dialog was rendered for
+        self._health_bar: Optional[pygame.Surface] = None
+        self._health_bar_key = None  # (fill width, bar size) the health bar was drawn for
         
         # Layout (responsive) - after room_positions is initialized
         self._calculate_layout()
@@ -165,9 +207,22 @@ class EscapeRoomGUI:
         # Create buttons after layout is calculated
         self._create_buttons()
         
+        # Button action name -> handler
+        self._actions = {
+            "auto_move": self.action_auto_move,
+            "find_key": self.action_find_key,
+            "plan_escape": self.action_plan_escape,
+            "solve_puzzle": self.action_solve_puzzle,
+            "next_turn": self.next_turn,
+            "ai_solver": self.action_ai_solver,
+            "ai_step": self.action_ai_step,
+            "reset_game": self.reset_game,
+            "toggle_fullscreen": self.toggle_fullscreen,
+        }
+        
         # Event log
-        self.event_log: List[str] = []
         self.max_log_entries = 10
+        self.event_log: deque = deque(maxlen=self.max_log_entries)  # (text, color); oldest entries drop off
         
         # Path visualization
         self.current_path: Optional[List[int]] = None
@@ -179,6 +234,8 @@ class EscapeRoomGUI:
         # AI solution display
         self.ai_solution_steps = []
         self.showing_solution = False
+        self._ai_solution_key = None  # (steps, width, height) the cached panel was rendered for
+        self._ai_solution_surface: Optional[pygame.Surface] = None
         self.fullscreen = False
         self.use_astar = False  # Pathfinding method
         
@@ -252,11 +309,78 @@ class EscapeRoomGUI:
             )
             self.buttons.append(button)
             
+        # Bake button faces now so drawing them is a single blit
+        for button in self.buttons:
+            button.prerender(self.font_small)
+            
+    def _build_room_labels(self):
+        """Pre-render the room number drawn inside each room circle"""
+        self._room_id_surfaces = [self.font_small.render(str(room_id), True, Colors.BLACK).convert_alpha()
+                                  for room_id in range(len(self.env.rooms))]
+        
+    def _render(self, text: str, font: pygame.font.Font, color: Tuple[int, int, int]) -> pygame.Surface:
+        """font.render with a cache, for panel text that repeats frame after frame"""
+        key = (text, id(font), color)
+        if key in self._text_cache:
+            self._text_cache.move_to_end(key)
+            return self._text_cache[key]
+            
+        text_surface = self._text_cache[key] = font.render(text, True, color).convert_alpha()
+        if len(self._text_cache) > TEXT_CACHE_MAX:
+            self._text_cache.popitem(last=False)
+        return text_surface
+        
+    def _render_shadowed(self, text: str, font: pygame.font.Font, color: Tuple[int, int, int],
+                         shadow: Tuple[int, int, int] = SHADOW_COLOR) -> pygame.Surface:
+        """Text with a drop shadow 2px down-right, composed once into one cached surface"""
+        key = (text, id(font), color, shadow)
+        if key in self._text_cache:
+            self._text_cache.move_to_end(key)
+            return self._text_cache[key]
+            
+        width, height = font.size(text)
+        text_surface = pygame.Surface((width + 2, height + 2), pygame.SRCALPHA)
+        text_surface.blit(font.render(text, True, shadow), (2, 2))
+        text_surface.blit(font.render(text, True, color), (0, 0))
+        text_surface = self._text_cache[key] = text_surface.convert_alpha()
+        if len(self._text_cache) > TEXT_CACHE_MAX:
+            self._text_cache.popitem(last=False)
+        return text_surface
+        
+    def _circle_sprite(self, color: Tuple[int, int, int], radius: int, border: int = 0) -> pygame.Surface:
+        """Filled circle with an optional white outline, drawn once and reused"""
+        key = (color, radius, border)
+        sprite = self._circle_sprites.get(key)
+        if sprite is None:
+            size = radius * 2 + 1
+            sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+            pygame.draw.circle(sprite, color, (radius, radius), radius)
+            if border:
+                pygame.draw.circle(sprite, Colors.WHITE, (radius, radius), radius, border)
+            sprite = self._circle_sprites[key] = sprite.convert_alpha()
+        return sprite
+        
+    def _blit_circle(self, surface: pygame.Surface, color: Tuple[int, int, int], center: Tuple[int, int],
+                     radius: int, border: int = 0):
+        """Blit a cached circle sprite centered on a point"""
+        surface.blit(self._circle_sprite(color, radius, border), (center[0] - radius, center[1] - radius))
+        
     def add_log(self, message: str):
-        """Add message to event log"""
-        self.event_log.append(message)
-        if len(self.event_log) > self.max_log_entries:
-            self.event_log.pop(0)
+        """Add message to event log (stored as the displayed text and its color)"""
+        self.event_log.append((message[:60], self._log_color(message)))
+        
+    @staticmethod
+    def _log_color(message: str) -> Tuple[int, int, int]:
+        """Color code log messages"""
+        if "VICTORY" in message or "🏆" in message:
+            return Colors.ROOM_START
+        elif "AI" in message or "🤖" in message:
+            return Colors.PRIMARY_BLUE
+        elif "ERROR" in message or "❌" in message:
+            return Colors.GUARD
+        elif "KEY" in message or "🔑" in message:
+            return Colors.KEY
+        return Colors.TEXT_COLOR
             
     def _calculate_layout(self):
         """Calculate responsive layout based on current window size"""
@@ -279,14 +403,35 @@ class EscapeRoomGUI:
         self.controls_area = pygame.Rect(right_panel_x, self.stats_area.bottom + 20, right_panel_width, 350)
         self.log_area = pygame.Rect(right_panel_x, self.controls_area.bottom + 20, right_panel_width, height - self.controls_area.bottom - 40)
         
+        # Fixed offsets inside the panels, used on every draw
+        self._map_shadow = self.map_area.move(3, 3)
+        self._stats_shadow = self.stats_area.move(3, 3)
+        self._controls_shadow = self.controls_area.move(3, 3)
+        self._log_shadow = self.log_area.move(3, 3)
+        self._stats_title_pos = (self.stats_area.x + 15, self.stats_area.y + 15)
+        self._stats_row_ys = [self.stats_area.y + 55 + i * 30 for i in range(STATS_ROWS)]
+        self._health_bar_rect = pygame.Rect(self.stats_area.x + 15, self._stats_row_ys[-1] + 40,
+                                            self.stats_area.width - 30, 25)
+        
         # Recalculate room positions for new map area
         self._calculate_room_positions()
+        self._edges_key = None
         
         # Recreate buttons with new layout
         self.buttons.clear()
         self._create_buttons()
         
+        # Legend width and panel chrome follow the layout
+        self._legend_cache = None
+        self._background = None
+        
     def _create_legend_surface(self) -> pygame.Surface:
+        """Legend surface explaining the map elements (built once per layout)"""
+        if self._legend_cache is None:
+            self._legend_cache = self._build_legend_surface().convert_alpha()
+        return self._legend_cache
+        
+    def _build_legend_surface(self) -> pygame.Surface:
         """Create a legend surface explaining the map elements"""
         legend_width = self.map_area.width - 20
         legend_height = 100
@@ -294,9 +439,6 @@ class EscapeRoomGUI:
         surface = pygame.Surface((legend_width, legend_height), pygame.SRCALPHA)
         
         # Background - light theme with shadow
-        shadow_surface = pygame.Surface((legend_width, legend_height))
-        shadow_surface.fill((150, 150, 150))
-        
         pygame.draw.rect(surface, (150, 150, 150), (2, 2, legend_width, legend_height), border_radius=8)
         pygame.draw.rect(surface, Colors.PANEL_BG, (0, 0, legend_width, legend_height), border_radius=8)
         pygame.draw.rect(surface, Colors.PRIMARY_BLUE, (0, 0, legend_width, legend_height), 2, border_radius=8)
@@ -304,24 +446,22 @@ class EscapeRoomGUI:
         font = self.font_small
         
         # Title with shadow
-        title_shadow = font.render("MAP LEGEND", True, (150, 150, 150))
-        surface.blit(title_shadow, (12, 10))
-        title = font.render("MAP LEGEND", True, Colors.TEXT_COLOR)
-        surface.blit(title, (10, 8))
+        surface.blit(self._render_shadowed("MAP LEGEND", font, Colors.TEXT_COLOR), (10, 8))
         
-        # Legend items with improved styling
+        # Legend items with improved styling (the drawn color dot is the icon; the default
+        # font has no emoji glyphs)
         items = [
-            ("🟢", "Unvisited Room", Colors.ROOM_NORMAL),
-            ("🔵", "Current Location", Colors.ROOM_CURRENT),
-            ("🟠", "Exit Room", Colors.ROOM_EXIT),
-            ("🔑", "Key Location", Colors.KEY),
-            ("🔴", "Trap/Guard", Colors.TRAP),
-            ("🟡", "Planned Path", Colors.PATH_COLOR)
+            ("Unvisited Room", Colors.ROOM_NORMAL),
+            ("Current Location", Colors.ROOM_CURRENT),
+            ("Exit Room", Colors.ROOM_EXIT),
+            ("Key Location", Colors.KEY),
+            ("Trap/Guard", Colors.TRAP),
+            ("Planned Path", Colors.PATH_COLOR)
         ]
         
         x_start = 15
         y_start = 35
-        for i, (emoji, text, color) in enumerate(items):
+        for i, (text, color) in enumerate(items):
             x = x_start + (i % 3) * 110
             y = y_start + (i // 3) * 25
             
@@ -330,7 +470,7 @@ class EscapeRoomGUI:
             pygame.draw.circle(surface, Colors.WHITE, (x, y), 7, 1)
             
             # Draw text with subtle styling
-            text_surface = font.render(f"{emoji} {text}", True, Colors.TEXT_COLOR)
+            text_surface = font.render(text, True, Colors.TEXT_COLOR)
             surface.blit(text_surface, (x + 12, y - 9))
             
         return surface
@@ -347,6 +487,10 @@ class EscapeRoomGUI:
         self.showing_solution = False
         self.ai_solution_steps = []
         
+        # Drop text from the previous game (stats, log lines)
+        self._text_cache.clear()
+        self._build_room_labels()
+        
         self.add_log("🔄 Game Reset!")
         self.add_log(f"Collect {self.env.total_keys} keys and reach the exit!")
         self.add_log(f"Exit room is now Room {self.env.exit_room_id} (randomized)")
@@ -388,16 +532,16 @@ class EscapeRoomGUI:
                     step_type = "Find key in"
                 elif room.has_puzzle:
                     step_type = "Solve puzzle in"
-                elif room_id not in agent.rooms_visited:
+                elif not agent.has_visited(room_id):
                     step_type = "Explore"
                     
                 self.ai_solution_steps.append(f"⚡ Step {i+1}: {step_type} Room {room_id} ({room.name})")
         
         # Add final summary
-        if len(agent.keys_collected) >= env.total_keys:
-            self.ai_solution_steps.append(f"🏆 VICTORY: Escaped with {len(agent.keys_collected)}/{env.total_keys} keys in {agent.moves_made} moves")
+        if agent.has_all_keys():
+            self.ai_solution_steps.append(f"🏆 VICTORY: Escaped with {agent.key_count()}/{env.total_keys} keys in {agent.moves_made} moves")
         else:
-            self.ai_solution_steps.append(f"❌ Need {env.total_keys - len(agent.keys_collected)} more keys to escape")
+            self.ai_solution_steps.append(f"❌ Need {env.total_keys - agent.key_count()} more keys to escape")
             
         # Add efficiency analysis
         efficiency = (env.total_keys / max(agent.moves_made, 1)) * 100
@@ -417,8 +561,6 @@ class EscapeRoomGUI:
         if room_id == self.agent.current_room:
             return Colors.ROOM_CURRENT
             
-        # Based on trap probability (heatmap)
-        trap_prob = self.agent.belief_system.get_trap_probability(room_id)
         if room.visited:
             # Visited rooms - show if trap was found
             if room.trap_triggered:
@@ -426,7 +568,8 @@ class EscapeRoomGUI:
             else:
                 return Colors.ROOM_VISITED
         else:
-            # Unvisited - show risk level
+            # Unvisited - show risk level based on trap probability (heatmap)
+            trap_prob = self.agent.belief_system.get_trap_probability(room_id)
             if trap_prob > 0.6:
                 return Colors.RISK_HIGH
             elif trap_prob > 0.3:
@@ -434,22 +577,42 @@ class EscapeRoomGUI:
             else:
                 return Colors.RISK_LOW
                 
-    def draw_room(self, surface: pygame.Surface, room_id: int):
-        """Draw a single room"""
+    def get_room_colors(self) -> List[Tuple[int, int, int]]:
+        """Colors for all rooms in one pass, indexed by room ID (same rules as get_room_color)"""
+        trap_probs = self.agent.belief_system.get_trap_probabilities()
+        colors = []
+        for room_id, room in enumerate(self.env.rooms):
+            if room.visited:
+                colors.append(Colors.TRAP if room.trap_triggered else Colors.ROOM_VISITED)
+            elif trap_probs[room_id] > 0.6:
+                colors.append(Colors.RISK_HIGH)
+            elif trap_probs[room_id] > 0.3:
+                colors.append(Colors.RISK_MEDIUM)
+            else:
+                colors.append(Colors.RISK_LOW)
+                
+        # Special rooms take priority (start over exit over current)
+        colors[self.agent.current_room] = Colors.ROOM_CURRENT
+        colors[self.env.exit_room_id] = Colors.ROOM_EXIT
+        colors[self.env.start_room_id] = Colors.ROOM_START
+        return colors
+        
+    def draw_room(self, surface: pygame.Surface, room_id: int, color: Optional[Tuple[int, int, int]] = None):
+        """Draw a single room (color defaults to get_room_color)"""
         if room_id not in self.room_positions:
             return
             
         x, y = self.room_positions[room_id]
         room = self.env.get_room(room_id)
-        color = self.get_room_color(room_id)
+        if color is None:
+            color = self.get_room_color(room_id)
         
         # Draw room circle
         room_radius = 25
-        pygame.draw.circle(surface, color, (x, y), room_radius)
-        pygame.draw.circle(surface, Colors.WHITE, (x, y), room_radius, 2)
+        self._blit_circle(surface, color, (x, y), room_radius, 2)
         
         # Draw room number
-        text = self.font_small.render(str(room_id), True, Colors.BLACK)
+        text = self._room_id_surfaces[room_id]
         text_rect = text.get_rect(center=(x, y))
         surface.blit(text, text_rect)
         
@@ -457,8 +620,8 @@ class EscapeRoomGUI:
         icon_y = y - room_radius - 15
         
         # Key icon
-        if room.has_key and room.key_id not in self.agent.keys_collected:
-            pygame.draw.circle(surface, Colors.KEY, (x, icon_y), 8)
+        if room.has_key and not self.agent.has_key(room.key_id):
+            self._blit_circle(surface, Colors.KEY, (x, icon_y), 8)
             
         # Trap icon (if known)
         if room.trap_triggered:
@@ -468,35 +631,42 @@ class EscapeRoomGUI:
                 (x + 7, icon_y + 5)
             ])
             
-    def draw_connections(self, surface: pygame.Surface):
-        """Draw connections between rooms"""
-        for room_id, room in self.env.rooms.items():
-            if room_id not in self.room_positions:
+    def _build_edges(self) -> List[Tuple[Tuple[int, int], Tuple[int, int], bool]]:
+        """Each connection once as (start_point, end_point, is_locked) in screen coordinates"""
+        positions = self.room_positions
+        edges = []
+        for room_id, room in enumerate(self.env.rooms):
+            if room_id not in positions:
                 continue
                 
-            x1, y1 = self.room_positions[room_id]
-            
             for neighbor_id, is_locked in room.neighbors:
-                if neighbor_id not in self.room_positions:
-                    continue
-                    
-                # Only draw each connection once
-                if neighbor_id > room_id:
-                    x2, y2 = self.room_positions[neighbor_id]
-                    
-                    # Choose color based on lock status
-                    color = Colors.GRAY if not is_locked else Colors.DARK_GRAY
-                    thickness = 2 if not is_locked else 1
-                    
-                    # Draw line
-                    pygame.draw.line(surface, color, (x1, y1), (x2, y2), thickness)
-                    
-                    # Draw lock icon if locked
-                    if is_locked:
-                        mid_x = (x1 + x2) // 2
-                        mid_y = (y1 + y2) // 2
-                        pygame.draw.rect(surface, Colors.DARK_GRAY,
-                                       (mid_x - 5, mid_y - 5, 10, 10))
+                # Only keep each connection once
+                if neighbor_id > room_id and neighbor_id in positions:
+                    edges.append((positions[room_id], positions[neighbor_id], is_locked))
+        return edges
+        
+    def draw_connections(self, surface: pygame.Surface):
+        """Draw connections between rooms"""
+        # Edge list depends on the layout and on which doors are locked
+        key = (self.env, self.env.graph_version)
+        if self._edges_key != key:
+            self._edges = self._build_edges()
+            self._edges_key = key
+            
+        for (x1, y1), (x2, y2), is_locked in self._edges:
+            # Choose color based on lock status
+            color = Colors.GRAY if not is_locked else Colors.DARK_GRAY
+            thickness = 2 if not is_locked else 1
+            
+            # Draw line
+            pygame.draw.line(surface, color, (x1, y1), (x2, y2), thickness)
+            
+            # Draw lock icon if locked
+            if is_locked:
+                mid_x = (x1 + x2) // 2
+                mid_y = (y1 + y2) // 2
+                pygame.draw.rect(surface, Colors.DARK_GRAY,
+                               (mid_x - 5, mid_y - 5, 10, 10))
                         
     def draw_path(self, surface: pygame.Surface):
         """Draw current planned path"""
@@ -517,11 +687,10 @@ class EscapeRoomGUI:
         """Draw agent"""
         if self.agent.current_room in self.room_positions:
             x, y = self.room_positions[self.agent.current_room]
-            pygame.draw.circle(surface, Colors.AGENT, (x, y), 15)
-            pygame.draw.circle(surface, Colors.WHITE, (x, y), 15, 2)
+            self._blit_circle(surface, Colors.AGENT, (x, y), 15, 2)
             
             # Draw 'A' for Agent
-            text = self.font_medium.render("A", True, Colors.BLACK)
+            text = self._render("A", self.font_medium, Colors.BLACK)
             text_rect = text.get_rect(center=(x, y))
             surface.blit(text, text_rect)
             
@@ -532,34 +701,15 @@ class EscapeRoomGUI:
             
         if self.guard.current_room in self.room_positions:
             x, y = self.room_positions[self.guard.current_room]
-            pygame.draw.circle(surface, Colors.GUARD, (x, y), 15)
-            pygame.draw.circle(surface, Colors.WHITE, (x, y), 15, 2)
+            self._blit_circle(surface, Colors.GUARD, (x, y), 15, 2)
             
             # Draw 'G' for Guard
-            text = self.font_medium.render("G", True, Colors.WHITE)
+            text = self._render("G", self.font_medium, Colors.WHITE)
             text_rect = text.get_rect(center=(x, y))
             surface.blit(text, text_rect)
             
     def draw_map(self, surface: pygame.Surface):
-        """Draw the entire map with shadow effect"""
-        # Draw shadow
-        shadow_rect = self.map_area.copy()
-        shadow_rect.x += 3
-        shadow_rect.y += 3
-        shadow_surface = pygame.Surface((shadow_rect.width, shadow_rect.height))
-        shadow_surface.fill((150, 150, 150))
-        surface.blit(shadow_surface, (shadow_rect.x, shadow_rect.y))
-        
-        # Draw map background
-        pygame.draw.rect(surface, Colors.PANEL_BG, self.map_area, border_radius=8)
-        pygame.draw.rect(surface, Colors.PRIMARY_BLUE, self.map_area, 2, border_radius=8)
-        
-        # Title with shadow
-        title_shadow = self.font_large.render("Escape Room Map", True, (150, 150, 150))
-        surface.blit(title_shadow, (self.map_area.x + 12, self.map_area.y + 12))
-        title = self.font_large.render("Escape Room Map", True, Colors.TEXT_COLOR)
-        surface.blit(title, (self.map_area.x + 10, self.map_area.y + 10))
-        
+        """Draw the map contents (the panel itself is part of the cached background)"""
         # Draw connections first (so they appear behind rooms)
         self.draw_connections(surface)
         
@@ -567,8 +717,8 @@ class EscapeRoomGUI:
         self.draw_path(surface)
         
         # Draw rooms
-        for room_id in self.env.rooms:
-            self.draw_room(surface, room_id)
+        for room_id, color in enumerate(self.get_room_colors()):
+            self.draw_room(surface, room_id, color)
             
         # Draw guard
         self.draw_guard(surface)
@@ -577,138 +727,137 @@ class EscapeRoomGUI:
         self.draw_agent(surface)
         
     def draw_stats(self, surface: pygame.Surface):
-        """Draw statistics panel with shadow effect"""
-        # Draw shadow
-        shadow_rect = self.stats_area.copy()
-        shadow_rect.x += 3
-        shadow_rect.y += 3
-        shadow_surface = pygame.Surface((shadow_rect.width, shadow_rect.height))
-        shadow_surface.fill((150, 150, 150))
-        surface.blit(shadow_surface, (shadow_rect.x, shadow_rect.y))
-        
-        # Draw panel background
-        pygame.draw.rect(surface, Colors.PANEL_BG, self.stats_area, border_radius=8)
-        pygame.draw.rect(surface, Colors.PRIMARY_BLUE, self.stats_area, 2, border_radius=8)
-        
-        x = self.stats_area.x + 15
-        y = self.stats_area.y + 15
-        line_height = 30
-        
-        # Title with shadow
-        title_shadow = self.font_medium.render("Agent Status", True, (150, 150, 150))
-        surface.blit(title_shadow, (x + 2, y + 2))
-        title = self.font_medium.render("Agent Status", True, Colors.TEXT_COLOR)
-        surface.blit(title, (x, y))
-        y += line_height + 10
+        """Draw the agent statistics inside the status panel"""
+        x = self._stats_title_pos[0]
         
         # Stats
         stats = [
             f"Turn: {self.turn}",
             f"Location: Room {self.agent.current_room}",
             f"Health: {self.agent.health}/{self.config.AGENT_HEALTH}",
-            f"Keys: {len(self.agent.keys_collected)}/{self.env.total_keys}",
+            f"Keys: {self.agent.key_count()}/{self.env.total_keys}",
             f"Moves: {self.agent.moves_made}",
-            f"Rooms Visited: {len(self.agent.rooms_visited)}/{self.env.room_count}",
+            f"Rooms Visited: {self.agent.rooms_visited_count()}/{self.env.room_count}",
         ]
         
-        for stat in stats:
-            text = self.font_small.render(stat, True, Colors.TEXT_COLOR)
-            surface.blit(text, (x, y))
-            y += line_height
+        surface.blits([(self._render(stat, self.font_small, Colors.TEXT_COLOR), (x, row_y))
+                       for stat, row_y in zip(stats, self._stats_row_ys)], doreturn=False)
             
-        # Health bar
-        y += 10
-        bar_width = self.stats_area.width - 30
-        bar_height = 25
+        # Health bar, redrawn only when the fill width changes
+        bar_rect = self._health_bar_rect
+        health_ratio = self.agent.health / self.config.AGENT_HEALTH
+        fill_width = int(bar_rect.width * health_ratio)
+        
+        key = (fill_width, bar_rect.size)
+        if key != self._health_bar_key:
+            self._health_bar = self._build_health_bar(bar_rect.width, bar_rect.height, fill_width)
+            self._health_bar_key = key
+        surface.blit(self._health_bar, bar_rect.topleft)
+        
+    def _build_health_bar(self, width: int, height: int, fill_width: int) -> pygame.Surface:
+        """Rounded health bar with its drop shadow, drawn at the origin"""
+        bar = pygame.Surface((width + 2, height + 2), pygame.SRCALPHA)
+        bar_rect = pygame.Rect(0, 0, width, height)
         
         # Background with shadow
-        bg_shadow_surface = pygame.Surface((bar_width, bar_height))
-        bg_shadow_surface.fill((120, 120, 120))
-        bg_shadow_rect = pygame.Rect(x + 2, y + 2, bar_width, bar_height)
-        surface.blit(bg_shadow_surface, bg_shadow_rect)
+        bar.fill((120, 120, 120), bar_rect.move(2, 2))
         
-        pygame.draw.rect(surface, Colors.HEALTH_BAR_BG, (x, y, bar_width, bar_height), border_radius=4)
+        pygame.draw.rect(bar, Colors.HEALTH_BAR_BG, bar_rect, border_radius=4)
         
         # Health fill
-        health_ratio = self.agent.health / self.config.AGENT_HEALTH
-        fill_width = int(bar_width * health_ratio)
-        pygame.draw.rect(surface, Colors.HEALTH_BAR, (x, y, fill_width, bar_height), border_radius=4)
+        pygame.draw.rect(bar, Colors.HEALTH_BAR, (0, 0, fill_width, height), border_radius=4)
         
         # Border
-        pygame.draw.rect(surface, Colors.PRIMARY_BLUE, (x, y, bar_width, bar_height), 2, border_radius=4)
+        pygame.draw.rect(bar, Colors.PRIMARY_BLUE, bar_rect, 2, border_radius=4)
+        
+        return bar.convert_alpha()
         
     def draw_controls(self, surface: pygame.Surface):
-        """Draw control panel with shadow effect"""
-        # Draw shadow
-        shadow_rect = self.controls_area.copy()
-        shadow_rect.x += 3
-        shadow_rect.y += 3
-        shadow_surface = pygame.Surface((shadow_rect.width, shadow_rect.height))
-        shadow_surface.fill((150, 150, 150))
-        surface.blit(shadow_surface, (shadow_rect.x, shadow_rect.y))
+        """Draw the control buttons"""
+        # Draw buttons
+        for button in self.buttons:
+            button.draw(surface, self.font_small)
+            
+    def draw_log(self, surface: pygame.Surface):
+        """Draw the event log entries"""
+        # Log entries
+        x = self.log_area.x + 15
+        y = self.log_area.y + 45
+        line_height = 18
+        
+        surface.blits([(self._render(message, self.font_small, color), (x, y + i * line_height))
+                       for i, (message, color) in enumerate(self.event_log)], doreturn=False)
+            
+    def _build_background(self) -> pygame.Surface:
+        """Render everything that only changes with the layout: page, legend and panel chrome"""
+        surface = pygame.Surface(self.screen.get_size())
+        surface.fill(Colors.BACKGROUND)
+        
+        # Draw legend at top
+        surface.blit(self._create_legend_surface(), (self.map_area.x, 10))
+        
+        # Map panel: shadow
+        surface.fill(SHADOW_COLOR, self._map_shadow)
+        
+        # Draw panel background
+        pygame.draw.rect(surface, Colors.PANEL_BG, self.map_area, border_radius=8)
+        pygame.draw.rect(surface, Colors.PRIMARY_BLUE, self.map_area, 2, border_radius=8)
+        
+        # Title with shadow
+        title = self._render_shadowed("Escape Room Map", self.font_large, Colors.TEXT_COLOR)
+        surface.blit(title, (self.map_area.x + 10, self.map_area.y + 10))
+        
+        # Stats panel: shadow
+        surface.fill(SHADOW_COLOR, self._stats_shadow)
+        
+        # Draw panel background
+        pygame.draw.rect(surface, Colors.PANEL_BG, self.stats_area, border_radius=8)
+        pygame.draw.rect(surface, Colors.PRIMARY_BLUE, self.stats_area, 2, border_radius=8)
+        
+        x, y = self._stats_title_pos
+        
+        # Title with shadow
+        surface.blit(self._render_shadowed("Agent Status", self.font_medium, Colors.TEXT_COLOR), (x, y))
+        
+        # Controls panel: shadow
+        surface.fill(SHADOW_COLOR, self._controls_shadow)
         
         # Draw panel background
         pygame.draw.rect(surface, Colors.PANEL_BG, self.controls_area, border_radius=8)
         pygame.draw.rect(surface, Colors.PRIMARY_BLUE, self.controls_area, 2, border_radius=8)
         
         # Title with shadow
-        title_shadow = self.font_medium.render("Controls", True, (150, 150, 150))
-        surface.blit(title_shadow, (self.controls_area.x + 17, self.controls_area.y + 12))
-        title = self.font_medium.render("Controls", True, Colors.TEXT_COLOR)
+        title = self._render_shadowed("Controls", self.font_medium, Colors.TEXT_COLOR)
         surface.blit(title, (self.controls_area.x + 15, self.controls_area.y + 10))
         
-        # Draw buttons
-        for button in self.buttons:
-            button.draw(surface, self.font_small)
-            
-    def draw_log(self, surface: pygame.Surface):
-        """Draw event log with shadow effect"""
-        # Draw shadow
-        shadow_rect = self.log_area.copy()
-        shadow_rect.x += 3
-        shadow_rect.y += 3
-        shadow_surface = pygame.Surface((shadow_rect.width, shadow_rect.height))
-        shadow_surface.fill((150, 150, 150))
-        surface.blit(shadow_surface, (shadow_rect.x, shadow_rect.y))
+        # Log panel: shadow
+        surface.fill(SHADOW_COLOR, self._log_shadow)
         
         # Draw panel background
         pygame.draw.rect(surface, Colors.PANEL_BG, self.log_area, border_radius=8)
         pygame.draw.rect(surface, Colors.PRIMARY_BLUE, self.log_area, 2, border_radius=8)
         
         # Title with shadow
-        title_shadow = self.font_medium.render("Event Log", True, (150, 150, 150))
-        surface.blit(title_shadow, (self.log_area.x + 17, self.log_area.y + 12))
-        title = self.font_medium.render("Event Log", True, Colors.TEXT_COLOR)
+        title = self._render_shadowed("Event Log", self.font_medium, Colors.TEXT_COLOR)
         surface.blit(title, (self.log_area.x + 15, self.log_area.y + 10))
         
-        # Log entries
-        x = self.log_area.x + 15
-        y = self.log_area.y + 45
-        line_height = 18
+        return surface.convert()
         
-        for message in self.event_log[-10:]:
-            # Color code messages
-            color = Colors.TEXT_COLOR
-            if "VICTORY" in message or "🏆" in message:
-                color = Colors.ROOM_START
-            elif "AI" in message or "🤖" in message:
-                color = Colors.PRIMARY_BLUE
-            elif "ERROR" in message or "❌" in message:
-                color = Colors.GUARD
-            elif "KEY" in message or "🔑" in message:
-                color = Colors.KEY
-                
-            text = self.font_small.render(message[:60], True, color)
-            surface.blit(text, (x, y))
-            y += line_height
-            
     def draw(self):
         """Draw everything"""
-        self.screen.fill(Colors.BACKGROUND)
-        
-        # Draw legend at top
-        legend_surface = self._create_legend_surface()
-        self.screen.blit(legend_surface, (self.map_area.x, 10))
+        if self._background is None:
+            self._background = self._build_background()
+            self._full_redraw = True
+            
+        # Only button hover states changed and no overlay covers the buttons: repaint just those
+        if not self._full_redraw and self._dirty_rects and not (self.showing_solution or self.game_over):
+            for rect in self._dirty_rects:
+                self.screen.blit(self._background, rect, rect)
+            self.draw_controls(self.screen)
+            self._update_display()
+            return
+            
+        self.screen.blit(self._background, (0, 0))
         
         self.draw_map(self.screen)
         self.draw_stats(self.screen)
@@ -723,7 +872,32 @@ class EscapeRoomGUI:
         if self.game_over:
             self.draw_game_over()
             
-        pygame.display.flip()
+        self._update_display()
+        
+    def mark_dirty(self, rect: Optional[pygame.Rect] = None):
+        """Schedule a screen region (or the whole screen) for the next display update"""
+        if rect is None:
+            self._full_redraw = True
+        else:
+            self._dirty_rects.append(rect)
+            
+    def needs_redraw(self) -> bool:
+        """Whether anything was marked dirty since the last display update"""
+        return self._full_redraw or bool(self._dirty_rects)
+        
+    def _update_display(self):
+        """Push only the dirty regions to the display, or flip when most of the screen changed"""
+        if not self._full_redraw and self._dirty_rects:
+            dirty_area = sum(rect.width * rect.height for rect in self._dirty_rects)
+            self._full_redraw = dirty_area >= self.screen.get_width() * self.screen.get_height()
+            
+        if self._full_redraw:
+            pygame.display.flip()
+        elif self._dirty_rects:
+            pygame.display.update(self._dirty_rects)
+            
+        self._dirty_rects = []
+        self._full_redraw = False
         
     def draw_ai_solution(self, surface: pygame.Surface):
         """Draw AI solution steps overlay in a dedicated panel"""
@@ -733,12 +907,19 @@ class EscapeRoomGUI:
         panel_x = self.controls_area.x
         panel_y = 120  # Below legend
         
-        # Create semi-transparent background with shadow effect
+        # Panel contents only change with the steps or the layout, so reuse the last render
         shadow_offset = 3
-        shadow_rect = pygame.Rect(panel_x + shadow_offset, panel_y + shadow_offset, panel_width, panel_height)
-        shadow_surface = pygame.Surface((panel_width, panel_height), pygame.SRCALPHA)
-        shadow_surface.fill((0, 0, 0, 100))
+        key = (tuple(self.ai_solution_steps), panel_width, panel_height)
+        if self._ai_solution_key != key:
+            self._ai_solution_surface = self._build_ai_solution_panel(panel_width, panel_height)
+            self._ai_solution_key = key
+            
+        # Draw everything with a semi-transparent shadow
+        darken(self.screen, (panel_x + shadow_offset, panel_y + shadow_offset, panel_width, panel_height), 100)
+        self.screen.blit(self._ai_solution_surface, (panel_x, panel_y))
         
+    def _build_ai_solution_panel(self, panel_width: int, panel_height: int) -> pygame.Surface:
+        """Render the AI solution panel"""
         # Main panel
         panel_surface = pygame.Surface((panel_width, panel_height), pygame.SRCALPHA)
         panel_surface.fill((245, 248, 255, 240))  # Light blue with transparency
@@ -749,15 +930,12 @@ class EscapeRoomGUI:
         # Draw close button
         close_button = pygame.Rect(panel_width - 30, 10, 20, 20)
         pygame.draw.rect(panel_surface, Colors.GUARD, close_button, border_radius=4)
-        close_text = self.font_small.render("X", True, Colors.WHITE)
+        close_text = self._render("X", self.font_small, Colors.WHITE)
         close_rect = close_text.get_rect(center=close_button.center)
         panel_surface.blit(close_text, close_rect)
         
         # Draw title with shadow
-        title = self.font_medium.render("🤖 AI SOLUTION GUIDE", True, Colors.TEXT_COLOR)
-        title_shadow = self.font_medium.render("🤖 AI SOLUTION GUIDE", True, (150, 150, 150))
-        panel_surface.blit(title_shadow, (12, 35))
-        panel_surface.blit(title, (10, 33))
+        panel_surface.blit(self._render_shadowed("🤖 AI SOLUTION GUIDE", self.font_medium, Colors.TEXT_COLOR), (10, 33))
         
         # Draw solution steps
         y_offset = 65
@@ -766,20 +944,8 @@ class EscapeRoomGUI:
         for i in range(max_steps):
             step = self.ai_solution_steps[i]
             
-            # Choose color based on step type
-            if "VICTORY" in step or "🎉" in step:
-                color = Colors.ROOM_START
-            elif "GET KEY" in step or "🔑" in step:
-                color = Colors.KEY
-            elif "SOLVE PUZZLE" in step or "🧩" in step:
-                color = Colors.PRIMARY_BLUE
-            elif "STEP" in step:
-                color = Colors.TEXT_COLOR
-            else:
-                color = Colors.GRAY
-                
             # Render step text
-            step_text = self.font_small.render(step, True, color)
+            step_text = self.font_small.render(step, True, self._step_color(step))
             panel_surface.blit(step_text, (15, y_offset))
             y_offset += 20
             
@@ -787,16 +953,25 @@ class EscapeRoomGUI:
             if "=" in step or "🏆" in step:
                 y_offset += 5
                 
-        # Draw everything with shadow
-        self.screen.blit(shadow_surface, (panel_x + shadow_offset, panel_y + shadow_offset))
-        self.screen.blit(panel_surface, (panel_x, panel_y))
+        return panel_surface.convert_alpha()
+        
+    @staticmethod
+    def _step_color(step: str) -> Tuple[int, int, int]:
+        """Choose color based on step type"""
+        if "VICTORY" in step or "🎉" in step:
+            return Colors.ROOM_START
+        elif "GET KEY" in step or "🔑" in step:
+            return Colors.KEY
+        elif "SOLVE PUZZLE" in step or "🧩" in step:
+            return Colors.PRIMARY_BLUE
+        elif "STEP" in step:
+            return Colors.TEXT_COLOR
+        return Colors.GRAY
         
     def draw_game_over(self):
         """Draw game over screen with improved design"""
-        # Create semi-transparent overlay
-        overlay = pygame.Surface((self.screen_width, self.screen_height), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 180))
-        self.screen.blit(overlay, (0, 0))
+        # Semi-transparent overlay
+        darken(self.screen, self.screen.get_rect(), 180)
         
         # Create modal dialog
         dialog_width = 400
@@ -805,21 +980,14 @@ class EscapeRoomGUI:
         dialog_y = (self.screen_height - dialog_height) // 2
         
         # Dialog shadow
-        shadow_rect = pygame.Rect(dialog_x + 5, dialog_y + 5, dialog_width, dialog_height)
-        shadow_surface = pygame.Surface((dialog_width, dialog_height))
-        shadow_surface.fill((100, 100, 100))
-        self.screen.blit(shadow_surface, (shadow_rect.x, shadow_rect.y))
-        
-        # Dialog background
-        dialog_surface = pygame.Surface((dialog_width, dialog_height))
-        dialog_surface.fill(Colors.PANEL_BG)
-        pygame.draw.rect(dialog_surface, Colors.PRIMARY_BLUE, (0, 0, dialog_width, dialog_height), 3, border_radius=12)
+        self.screen.fill((100, 100, 100), (dialog_x + 5, dialog_y + 5, dialog_width, dialog_height))
         
+        # Dialog contents only depend on the outcome text
         if self.victory:
             # Victory styling
             title_color = Colors.ROOM_START
             title_text = "🏆 VICTORY!"
-            subtext = f"Escaped with {len(self.agent.keys_collected)}/{self.env.total_keys} keys in {self.turn} turns!"
+            subtext = f"Escaped with {self.agent.key_count()}/{self.env.total_keys} keys in {self.turn} turns!"
             icon = "🎉"
         else:
             # Game over styling
@@ -828,55 +996,53 @@ class EscapeRoomGUI:
             subtext = f"Failed after {self.turn} turns"
             icon = "😔"
             
-        # Draw title with shadow
-        title_shadow = self.font_large.render(title_text, True, (100, 100, 100))
-        title_rect = title_shadow.get_rect(center=(dialog_width // 2 + 2, 60 + 2))
-        dialog_surface.blit(title_shadow, title_rect)
+        key = (title_text, subtext)
+        if self._game_over_key != key:
+            self._game_over_dialog = self._build_game_over_dialog(
+                dialog_width, dialog_height, title_text, title_color, subtext, icon)
+            self._game_over_key = key
+            
+        self.screen.blit(self._game_over_dialog, (dialog_x, dialog_y))
         
-        title = self.font_large.render(title_text, True, title_color)
-        title_rect = title.get_rect(center=(dialog_width // 2, 60))
+    def _build_game_over_dialog(self, dialog_width: int, dialog_height: int, title_text: str,
+                                title_color: Tuple[int, int, int], subtext: str, icon: str) -> pygame.Surface:
+        """Render the game over / victory dialog"""
+        # Dialog background
+        dialog_surface = pygame.Surface((dialog_width, dialog_height))
+        dialog_surface.fill(Colors.PANEL_BG)
+        pygame.draw.rect(dialog_surface, Colors.PRIMARY_BLUE, (0, 0, dialog_width, dialog_height), 3, border_radius=12)
+        
+        # Draw title with shadow
+        # Center the text itself; the shadow hangs 2px past its bottom-right corner
+        title = self._render_shadowed(title_text, self.font_large, title_color, (100, 100, 100))
+        title_rect = title.get_rect(center=(dialog_width // 2 + 1, 60 + 1))
         dialog_surface.blit(title, title_rect)
         
         # Draw icon
-        icon_surf = self.font_large.render(icon, True, title_color)
+        icon_surf = self._render(icon, self.font_large, title_color)
         icon_rect = icon_surf.get_rect(center=(dialog_width // 2, 30))
         dialog_surface.blit(icon_surf, icon_rect)
         
         # Draw subtext
-        sub = self.font_medium.render(subtext, True, Colors.TEXT_COLOR)
+        sub = self._render(subtext, self.font_medium, Colors.TEXT_COLOR)
         sub_rect = sub.get_rect(center=(dialog_width // 2, 100))
         dialog_surface.blit(sub, sub_rect)
         
         # Draw restart instructions
-        restart = self.font_small.render("Press R to restart or ESC to quit", True, Colors.GRAY)
+        restart = self._render("Press R to restart or ESC to quit", self.font_small, Colors.GRAY)
         restart_rect = restart.get_rect(center=(dialog_width // 2, dialog_height - 40))
         dialog_surface.blit(restart, restart_rect)
         
-        self.screen.blit(dialog_surface, (dialog_x, dialog_y))
+        return dialog_surface.convert()
         
     def handle_button_click(self, action: str):
         """Handle button actions"""
         if self.game_over:
             return
             
-        if action == "auto_move":
-            self.action_auto_move()
-        elif action == "find_key":
-            self.action_find_key()
-        elif action == "plan_escape":
-            self.action_plan_escape()
-        elif action == "solve_puzzle":
-            self.action_solve_puzzle()
-        elif action == "next_turn":
-            self.next_turn()
-        elif action == "ai_solver":
-            self.action_ai_solver()
-        elif action == "ai_step":
-            self.action_ai_step()
-        elif action == "reset_game":
-            self.reset_game()
-        elif action == "toggle_fullscreen":
-            self.toggle_fullscreen()
+        handler = self._actions.get(action)
+        if handler:
+            handler()
             
     def action_auto_move(self):
         """Auto move to next logical room (fixed logic)"""
@@ -889,7 +1055,7 @@ class EscapeRoomGUI:
         priority_targets = []
         
         # Priority 1: Find nearest key
-        if len(self.agent.keys_collected) < self.env.total_keys:
+        if not self.agent.has_all_keys():
             result = self.agent.find_nearest_key()
             if result:
                 key_room, path = result
@@ -897,7 +1063,7 @@ class EscapeRoomGUI:
                     priority_targets.append((path[1], "key", len(path)))
         
         # Priority 2: Go to exit if all keys collected
-        if len(self.agent.keys_collected) >= self.env.total_keys:
+        if self.agent.has_all_keys():
             exit_room = self.env.exit_room_id
             path = self.agent.find_path(self.agent.current_room, exit_room)
             if path and len(path) > 1:
@@ -950,7 +1116,7 @@ class EscapeRoomGUI:
     def action_solve_puzzle(self):
         """Solve puzzle in current room with visible puzzle"""
         current_room = self.env.get_room(self.agent.current_room)
-        locked_neighbors = [(nid, locked) for nid, locked in current_room.neighbors if locked]
+        locked_neighbors = tuple(current_room.locked_neighbor_ids)  # Snapshot, unlocking shrinks it
         
         if not locked_neighbors:
             self.add_log("No locked doors here!")
@@ -967,15 +1133,34 @@ class EscapeRoomGUI:
         
         if solution:
             # Unlock doors
-            for neighbor_id, locked in locked_neighbors:
-                if locked:
-                    self.env.unlock_door_between(self.agent.current_room, neighbor_id)
-                    
+            for neighbor_id in locked_neighbors:
+                self.env.unlock_door_between(self.agent.current_room, neighbor_id)
+                
             self.agent.puzzles_solved += 1
             self.add_log(f"Puzzle solved! Doors unlocked.")
         else:
             self.add_log("Puzzle solving failed!")
             
+    def _build_puzzle_chrome(self, dialog_width: int, dialog_height: int) -> pygame.Surface:
+        """Puzzle dialog background, border, title and close hint"""
+        dialog_surface = pygame.Surface((dialog_width, dialog_height), pygame.SRCALPHA)
+        dialog_surface.fill((250, 250, 255, 250))  # Light blue background
+        
+        # Draw border
+        pygame.draw.rect(dialog_surface, Colors.PRIMARY_BLUE, (0, 0, dialog_width, dialog_height), 3, border_radius=10)
+        
+        # Draw title
+        title = self._render("🧩 PUZZLE SOLVING", self.font_large, Colors.TEXT_COLOR)
+        title_rect = title.get_rect(center=(dialog_width // 2, 30))
+        dialog_surface.blit(title, title_rect)
+        
+        # Draw close instruction
+        close_text = self._render("Click anywhere to close", self.font_small, Colors.GRAY)
+        close_rect = close_text.get_rect(center=(dialog_width // 2, dialog_height - 30))
+        dialog_surface.blit(close_text, close_rect)
+        
+        return dialog_surface.convert_alpha()
+        
     def show_puzzle_dialog(self, puzzle_data, solution):
         """Display puzzle dialog to user"""
         # Create puzzle overlay
@@ -987,19 +1172,11 @@ class EscapeRoomGUI:
         # Create dialog surface with shadow
         shadow_offset = 5
         shadow_rect = pygame.Rect(dialog_x + shadow_offset, dialog_y + shadow_offset, dialog_width, dialog_height)
-        shadow_surface = pygame.Surface((dialog_width, dialog_height), pygame.SRCALPHA)
-        shadow_surface.fill((0, 0, 0, 150))
-        
-        dialog_surface = pygame.Surface((dialog_width, dialog_height), pygame.SRCALPHA)
-        dialog_surface.fill((250, 250, 255, 250))  # Light blue background
         
-        # Draw border
-        pygame.draw.rect(dialog_surface, Colors.PRIMARY_BLUE, (0, 0, dialog_width, dialog_height), 3, border_radius=10)
-        
-        # Draw title
-        title = self.font_large.render("🧩 PUZZLE SOLVING", True, Colors.TEXT_COLOR)
-        title_rect = title.get_rect(center=(dialog_width // 2, 30))
-        dialog_surface.blit(title, title_rect)
+        # Static frame, title and close hint are shared by every puzzle dialog
+        if self._puzzle_chrome is None:
+            self._puzzle_chrome = self._build_puzzle_chrome(dialog_width, dialog_height)
+        dialog_surface = self._puzzle_chrome.copy()
         
         # Draw puzzle description
         y_pos = 70
@@ -1037,25 +1214,23 @@ class EscapeRoomGUI:
         solution_rect = solution_surf.get_rect(center=(dialog_width // 2, y_pos))
         dialog_surface.blit(solution_surf, solution_rect)
         
-        # Draw close instruction
-        close_text = self.font_small.render("Click anywhere to close", True, Colors.GRAY)
-        close_rect = close_text.get_rect(center=(dialog_width // 2, dialog_height - 30))
-        dialog_surface.blit(close_text, close_rect)
-        
         # Draw everything
-        self.screen.blit(shadow_surface, (dialog_x + shadow_offset, dialog_y + shadow_offset))
+        darken(self.screen, shadow_rect, 150)
         self.screen.blit(dialog_surface, (dialog_x, dialog_y))
         pygame.display.flip()
         
-        # Wait for user to click
+        # Wait for user to click (event.wait sleeps until something happens)
         waiting = True
         while waiting:
-            for event in pygame.event.get():
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    waiting = False
-                elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
-                    waiting = False
-            self.clock.tick(60)
+            event = pygame.event.wait()
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                waiting = False
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                waiting = False
+            elif event.type == pygame.QUIT:
+                # Close the dialog and hand the quit on to the main loop
+                waiting = False
+                pygame.event.post(event)
             
     def next_turn(self):
         """Process next turn"""
@@ -1063,8 +1238,7 @@ class EscapeRoomGUI:
             return
         
         # Check victory conditions FIRST (before incrementing turn)
-        if (len(self.agent.keys_collected) >= self.env.total_keys and 
-            self.agent.current_room == self.env.exit_room_id):
+        if self.agent.has_all_keys() and self.agent.current_room == self.env.exit_room_id:
             self.game_over = True
             self.victory = True
             self.add_log("🏆 VICTORY! You escaped!")
@@ -1105,27 +1279,17 @@ class EscapeRoomGUI:
         self.add_log("🤖 Starting AI Solver...")
         self.add_log("⏳ Analyzing optimal path...")
         
+        # Simulate on the live environment from a snapshot, rolled back afterwards
+        env_state = self.env.snapshot()
         try:
-            # Store current state
-            original_env = Environment(self.config)
-            original_env.rooms = {r_id: room.copy() for r_id, room in self.env.rooms.items()}
-            original_env.total_keys = self.env.total_keys
-            original_env.start_room_id = self.env.start_room_id
-            original_env.exit_room_id = self.env.exit_room_id
-            
-            original_agent = Agent(original_env, self.config)
-            original_agent.current_room = self.agent.current_room
-            original_agent.keys_collected = list(self.agent.keys_collected)
-            original_agent.health = self.agent.health
-            original_agent.moves_made = self.agent.moves_made
-            original_agent.rooms_visited = set(self.agent.rooms_visited)
-            original_agent.belief_system = self.agent.belief_system
-            
-            # Create AI solver with clean environment
-            ai_solver = AISolver(config=self.config, verbose=False)
-            ai_solver.env = original_env
-            ai_solver.agent = original_agent
-            ai_solver.guard = Guard(original_env, self.config)
+            original_env = self.env
+            
+            # Independent agent (own beliefs) so the simulation leaves the player untouched
+            original_agent = self.agent.copy()
+            
+            # Create AI solver on the snapshotted state
+            ai_solver = AISolver(config=self.config, verbose=False, environment=original_env,
+                                 agent=original_agent, guard=Guard(original_env, self.config))
             ai_solver.turn = 0
             ai_solver.max_turns = self.config.MAX_TURNS
             
@@ -1134,7 +1298,7 @@ class EscapeRoomGUI:
             
             if success:
                 self.add_log("🎉 AI Solver: Victory achieved!")
-                self.add_log(f"📊 Optimal solution: {ai_solver.turn} turns, {original_agent.health} health, {len(original_agent.keys_collected)} keys")
+                self.add_log(f"📊 Optimal solution: {ai_solver.turn} turns, {original_agent.health} health, {original_agent.key_count()} keys")
                 
                 # Show step-by-step solution based on actual room visits
                 self.show_ai_solution_path(ai_solver.env, original_agent)
@@ -1143,19 +1307,19 @@ class EscapeRoomGUI:
                 self.add_log("😔 AI Solver: Failed to escape")
                 
             # Update GUI state with AI results (but don't reset current game)
-            self.add_log(f"📈 AI Results: {ai_solver.turn} turns, {original_agent.health} health, {len(original_agent.keys_collected)}/{original_env.total_keys} keys")
+            self.add_log(f"📈 AI Results: {ai_solver.turn} turns, {original_agent.health} health, {original_agent.key_count()}/{original_env.total_keys} keys")
+            self.env.restore(env_state)
             
         except Exception as e:
+            self.env.restore(env_state)
             self.add_log(f"❌ AI Solver error: {str(e)}")
             # Fallback: show basic solution path
             self.show_basic_solution_path()
             
         # Run AI on current game state
         try:
-            ai_solver_current = AISolver(config=self.config, verbose=False)
-            ai_solver_current.env = self.env
-            ai_solver_current.agent = self.agent
-            ai_solver_current.guard = self.guard
+            ai_solver_current = AISolver(config=self.config, verbose=False, environment=self.env,
+                                         agent=self.agent, guard=self.guard)
             ai_solver_current.turn = self.turn
             ai_solver_current.max_turns = self.config.MAX_TURNS
             
@@ -1198,7 +1362,7 @@ class EscapeRoomGUI:
                     self.ai_solution_steps.append(f"  Step {i+1}: ✅ You are here (Room {room_id})")
                 else:
                     room = self.env.get_room(room_id)
-                    if room.has_key and room.key_id not in self.agent.keys_collected:
+                    if room.has_key and not self.agent.has_key(room.key_id):
                         self.ai_solution_steps.append(f"  Step {i+1}: 🔑 Get key in Room {room_id}")
                     elif room.has_puzzle:
                         self.ai_solution_steps.append(f"  Step {i+1}: 🧩 Solve puzzle in Room {room_id}")
@@ -1209,7 +1373,7 @@ class EscapeRoomGUI:
             self.ai_solution_steps.append("💡 Try: Solving puzzles to unlock doors")
             
         # Add recommendations
-        keys_needed = self.env.total_keys - len(self.agent.keys_collected)
+        keys_needed = self.env.total_keys - self.agent.key_count()
         if keys_needed > 0:
             result = self.agent.find_nearest_key()
             if result:
@@ -1234,10 +1398,8 @@ class EscapeRoomGUI:
         self.add_log("🤖 AI Step...")
         
         # Create temporary AI solver for one step
-        ai_solver = AISolver(config=self.config, verbose=False)
-        ai_solver.env = self.env
-        ai_solver.agent = self.agent
-        ai_solver.guard = self.guard
+        ai_solver = AISolver(config=self.config, verbose=False, environment=self.env,
+                             agent=self.agent, guard=self.guard)
         ai_solver.turn = self.turn
         
         # Execute one AI decision
@@ -1253,9 +1415,8 @@ class EscapeRoomGUI:
             if solution:
                 room.puzzle_solved = True
                 # Unlock doors
-                for neighbor_id, is_locked in room.neighbors:
-                    if is_locked:
-                        self.env.unlock_door_between(current_room, neighbor_id)
+                for neighbor_id in tuple(room.locked_neighbor_ids):
+                    self.env.unlock_door_between(current_room, neighbor_id)
                 self.add_log("🧩 AI: Puzzle solved!")
                 self.agent.puzzles_solved += 1
             else:
@@ -1284,8 +1445,7 @@ class EscapeRoomGUI:
                 self.turn += 1
                 
                 # Check game end
-                if (len(self.agent.keys_collected) >= self.env.total_keys and 
-                    self.agent.current_room == self.env.exit_room_id):
+                if self.agent.has_all_keys() and self.agent.current_room == self.env.exit_room_id:
                     self.game_over = True
                     self.add_log("🎉 Victory! AI reached the exit!")
                 elif self.agent.health <= 0:
@@ -1310,7 +1470,7 @@ class EscapeRoomGUI:
                 
         # Check win/loss
         if self.agent.current_room == self.env.exit_room_id:
-            if len(self.agent.keys_collected) == self.env.total_keys:
+            if self.agent.has_all_keys():
                 self.game_over = True
                 self.victory = True
                 self.add_log("ESCAPED! YOU WIN!")
@@ -1325,12 +1485,23 @@ class EscapeRoomGUI:
             self.victory = False
             self.add_log("TIME'S UP!")
             
-    def handle_events(self):
-        """Handle pygame events"""
-        for event in pygame.event.get():
+    def handle_events(self, block: bool = False):
+        """
+        Handle pygame events
+        With block=True, sleep until at least one event arrives
+        """
+        events = pygame.event.get()
+        if block and not events:
+            events = [pygame.event.wait()]
+            
+        for event in events:
             if event.type == pygame.QUIT:
                 return False
                 
+            # Hovering only changes the buttons under the pointer; anything else may change the whole screen
+            if event.type != pygame.MOUSEMOTION:
+                self.mark_dirty()
+                
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     if self.fullscreen:
@@ -1355,11 +1526,15 @@ class EscapeRoomGUI:
                     close_button = pygame.Rect(panel_x + panel_width - 30, panel_y + 10, 20, 20)
                     if close_button.collidepoint(event.pos):
                         self.showing_solution = False
+                        self._ai_solution_key = self._ai_solution_surface = None
                         
             # Button handling
             for button in self.buttons:
+                was_hovered = button.hovered
                 if button.handle_event(event):
                     self.handle_button_click(button.action)
+                if button.hovered != was_hovered:
+                    self.mark_dirty(button.rect.inflate(2, 2).move(1, 1))  # Include the shadow
                     
         return True
         
@@ -1368,8 +1543,10 @@ class EscapeRoomGUI:
         running = True
         
         while running:
-            running = self.handle_events()
-            self.draw()
+            # Turn-based: when nothing is dirty or animating, idle until the next event
+            running = self.handle_events(block=not (self.needs_redraw() or self.animating))
+            if self.needs_redraw() or self.animating:
+                self.draw()
             self.clock.tick(self.fps)
             
         pygame.quit()
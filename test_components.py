@@ -6,7 +6,7 @@ Tests each module independently and integration
 import sys
 from config import Config
 from environment import Environment, Room
-from agent import Agent
+from agent import Agent, _bfs_csr
 from guard import Guard
 from csp_solver import CSPPuzzle, CSPSolver, generate_puzzle
 from bayesian_reasoning import BayesianBeliefSystem
@@ -45,7 +45,7 @@ def test_environment():
     
     # Test 2: Start and exit rooms exist
     test2 = print_test_result(
-        0 in env.rooms and env.exit_room_id in env.rooms,
+        env.get_room(0) is not None and env.get_room(env.exit_room_id) is not None,
         f"- Start (0) and Exit ({env.exit_room_id}) exist"
     )
     
@@ -66,14 +66,14 @@ def test_environment():
     )
     
     # Test 4: Keys placed
-    keys_found = sum(1 for room in env.rooms.values() if room.has_key)
+    keys_found = sum(1 for room in env.rooms if room.has_key)
     test4 = print_test_result(
         keys_found == config.NUM_KEYS,
         f"- Keys placed: {keys_found}/{config.NUM_KEYS}"
     )
     
     # Test 5: Traps placed
-    traps_found = sum(1 for room in env.rooms.values() if room.has_trap)
+    traps_found = sum(1 for room in env.rooms if room.has_trap)
     test5 = print_test_result(
         traps_found <= config.NUM_TRAPS,
         f"- Traps placed: {traps_found} (max {config.NUM_TRAPS})"
@@ -155,7 +155,25 @@ def test_bayesian_reasoning():
         f"- Path risk calculated: {risk:.3f}"
     )
     
-    return all([test1, test2, test3, test4, test5])
+    # Test 6: Batch update matches sequential updates
+    batch_system = BayesianBeliefSystem(num_rooms=10)
+    batch_system.update_beliefs([(5, "safe"), (7, "trap")])
+    test6 = print_test_result(
+        batch_system.trap_beliefs == belief_system.trap_beliefs and batch_system.version == 1,
+        "- Batch update matches sequential updates"
+    )
+    
+    # Test 7: Propagation follows the door graph when distances are given
+    # Ring 0-1-2-3-4-5-0: room 5 is one door from room 0 despite its ID
+    ring = [min(abs(u - v), 6 - abs(u - v)) for u in range(6) for v in range(6)]
+    graph_system = BayesianBeliefSystem(num_rooms=6, distances=ring)
+    graph_system.update_belief(0, "trap")
+    test7 = print_test_result(
+        graph_system.get_trap_probability(5) > graph_system.get_trap_probability(3),
+        f"- Graph propagation reached Room 5: P={graph_system.get_trap_probability(5):.2f}"
+    )
+    
+    return all([test1, test2, test3, test4, test5, test6, test7])
 
 
 def test_search_algorithms():
@@ -207,7 +225,88 @@ def test_search_algorithms():
         f"- Nearest key found: Room {key_result[0] if key_result else 'None'}"
     )
     
-    return all([test1, test2, test3, test4])
+    # Test path cache (hit returns same path, unlocking a door invalidates it)
+    print("\nTesting path cache:")
+    first = agent.find_path(start, goal)
+    cached = agent.find_path(start, goal)
+    cache_size = len(agent._path_cache)
+    env.unlock_door_between(0, 1)
+    agent.find_path(start, goal)
+    test5 = print_test_result(
+        first == cached and len(agent._path_cache) == cache_size + 1,
+        f"- Path cache reused and invalidated on unlock ({len(agent._path_cache)} entries)"
+    )
+    
+    # Test all-pairs table agrees with BFS on path length
+    table_path = env.shortest_path(start, goal)
+    bfs_path = agent.find_path_bfs(start, goal)
+    test6 = print_test_result(
+        table_path is not None and bfs_path is not None and len(table_path) == len(bfs_path),
+        f"- All-pairs path length matches BFS: {len(table_path) if table_path else 0}"
+    )
+    
+    # Test bidirectional BFS (threshold lowered; it is above every shipped map size)
+    print("\nTesting bidirectional BFS:")
+    test7 = _check_bidirectional_bfs(unlock_all=False) and _check_bidirectional_bfs(unlock_all=True)
+    print_test_result(test7, "- Bidirectional BFS matches CSR BFS on every room pair")
+    
+    return all([test1, test2, test3, test4, test5, test6, test7])
+
+
+def _reference_path_length(env: Environment, start: int, goal: int):
+    """Path length (rooms) from the plain CSR BFS kernel, or None if unreachable"""
+    if start == goal:
+        return 1
+    parent, _ = _bfs_csr(env.adj_nodes, env.adj_ptr, env.adj_locked, env.room_count, start, goal)
+    if parent is None:
+        return None
+    length, node = 1, goal
+    while node != start:
+        node = parent[node]
+        length += 1
+    return length
+
+
+def _check_bidirectional_bfs(unlock_all: bool) -> bool:
+    """Compare bidirectional BFS with _bfs_csr for all room pairs on a large map"""
+    config = Config()
+    config.MAP_SIZE = "large"
+    config.BIDIRECTIONAL_BFS_MIN_ROOMS = 0
+    env = Environment(config)
+    agent = Agent(env, config)
+    
+    if unlock_all:
+        for room in env.rooms:
+            for neighbor_id in tuple(room.locked_neighbor_ids):
+                env.unlock_door_between(room.id, neighbor_id)
+    else:
+        # Lock both directions of every door into the exit room so some goals are unreachable
+        exit_id = env.exit_room_id
+        flags, keys, adj_locked = env.snapshot()
+        exit_edges = range(env.adj_ptr[exit_id], env.adj_ptr[exit_id + 1])
+        for i in range(len(adj_locked)):
+            if env.adj_nodes[i] == exit_id or i in exit_edges:
+                adj_locked[i] = 1
+        env.restore((flags, keys, adj_locked))
+        
+    unreachable = 0
+    for start in range(env.room_count):
+        for goal in range(env.room_count):
+            path = agent.find_path_bfs(start, goal)
+            expected = _reference_path_length(env, start, goal)
+            if expected is None:
+                unreachable += 1
+                if path is not None:
+                    return False
+                continue
+            if path is None or len(path) != expected or path[0] != start or path[-1] != goal:
+                return False
+            # Every step must cross an unlocked door
+            for room_id, next_id in zip(path, path[1:]):
+                if next_id not in env.get_unlocked_neighbors(room_id):
+                    return False
+                    
+    return unlock_all or unreachable > 0
 
 
 def test_minimax_guard():
@@ -226,7 +325,7 @@ def test_minimax_guard():
     new_room, message = guard.make_move(player_room)
     
     test1 = print_test_result(
-        new_room in env.rooms,
+        0 <= new_room < len(env.rooms),
         f"- Guard made valid move: Room {initial_room} → Room {new_room}"
     )
     
@@ -299,7 +398,15 @@ def test_agent_movement():
         f"- Rooms visited: {len(agent.rooms_visited)}"
     )
     
-    return all([test1, test2, test3, test4])
+    # Test 5: Bitmask-backed key tracking
+    agent.keys_collected = {0, 2}
+    test5 = print_test_result(
+        agent.has_key(2) and not agent.has_key(1) and agent.key_count() == 2
+        and agent.keys_collected == {0, 2} and agent.has_visited(0),
+        f"- Key/visit bitmasks: keys={sorted(agent.keys_collected)}"
+    )
+    
+    return all([test1, test2, test3, test4, test5])
 
 
 def test_integration():